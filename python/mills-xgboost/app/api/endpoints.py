@@ -7,7 +7,6 @@ import uuid
 import logging
 import optuna
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import joblib
 
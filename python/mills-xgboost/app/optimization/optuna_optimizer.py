@@ -6,7 +6,6 @@ import numpy as np
 import pandas as pd
 import optuna
 import xgboost as xgb
-import matplotlib.pyplot as plt
 from typing import Dict, List, Any, Tuple
 import logging
 
@@ -259,6 +258,9 @@ def plot_optimization_results(study: optuna.study.Study, black_box_func: BlackBo
         study: The completed Optuna study
         black_box_func: The black box function that was optimized
     """
+    # Imported lazily - matplotlib is only needed when plots are actually produced
+    import matplotlib.pyplot as plt
+    
     # Get path to results directory
     current_dir = os.path.dirname(os.path.abspath(__file__))
     results_dir = os.path.join(current_dir, "optimization_results")
@@ -0,0 +1,66 @@
+"""
+Numba-compiled helpers for the cascade optimizers
+
+numba is optional: without it the decorated functions run as plain Python/numpy.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports both @njit and @njit(...))"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def compute_objectives(means, stds, cv_matrix, cv_lo, cv_hi, penalty_factor,
+                       uncertainty_weight, use_uncertainty, maximize):
+    """
+    Penalized optimization objectives for a batch of cascade predictions
+
+    Args:
+        means: Predicted target per sample, shape (n,)
+        stds: Predicted target std per sample, shape (n,) (ignored unless use_uncertainty)
+        cv_matrix: Predicted CVs, shape (n, n_cv); NaN entries are unconstrained
+        cv_lo: Lower CV bounds, shape (n_cv,)
+        cv_hi: Upper CV bounds, shape (n_cv,)
+        penalty_factor: Weight of the squared bound violation
+        uncertainty_weight: k in the robust objective mean ± k*std
+        use_uncertainty: Whether to use the robust objective
+        maximize: Optimization direction; the penalty always worsens the objective
+
+    Returns:
+        Tuple of (objective values, feasibility flags), both shape (n,)
+    """
+    n, m = cv_matrix.shape
+    objectives = np.empty(n, dtype=np.float64)
+    feasible = np.empty(n, dtype=np.bool_)
+    sign = -1.0 if maximize else 1.0
+    for i in range(n):
+        violation = 0.0
+        ok = True
+        for j in range(m):
+            v = cv_matrix[i, j]
+            d = 0.0
+            if v < cv_lo[j]:
+                d = cv_lo[j] - v
+            elif v > cv_hi[j]:
+                d = v - cv_hi[j]
+            if d > 0.0:
+                ok = False
+                violation += d * d
+        value = means[i]
+        if use_uncertainty:
+            # mean + k*std when minimizing, mean - k*std when maximizing
+            value += sign * uncertainty_weight * stds[i]
+        objectives[i] = value + sign * penalty_factor * violation
+        feasible[i] = ok
+    return objectives, feasible
+
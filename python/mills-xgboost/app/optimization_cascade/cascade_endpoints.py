@@ -6,13 +6,13 @@ Database-only cascade optimization system for mill process control.
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
-from typing import Dict, Optional, List
-import pandas as pd
+from typing import Dict, Optional, List, TYPE_CHECKING
+import asyncio
 import os
 from datetime import datetime
 
 from .cascade_models import CascadeModelManager
-from .gpr_cascade_models import GPRCascadeModelManager
+from .gpr_cascade_models import GPRCascadeModelManager, GPRPredictionBatcher
 from .simple_cascade_optimizer import SimpleCascadeOptimizer, OptimizationRequest, OptimizationResult
 from .gpr_cascade_optimizer import GPRCascadeOptimizer, GPROptimizationRequest, GPROptimizationResult
 from .target_driven_optimizer import TargetDrivenCascadeOptimizer, TargetOptimizationRequest, TargetOptimizationResult
@@ -27,20 +27,32 @@ except ImportError:
             return []
         def get_cvs(self):
             return []
+        def get_mv_steps(self):
+            return {}
 
-# Import database and settings
-try:
-    from ..database.db_connector import MillsDataConnector
-    from ...config.settings import settings
-except ImportError:
-    # Fallback for direct testing
-    import sys
-    import os
-    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'database'))
-    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
-    from db_connector import MillsDataConnector
-    from settings import Settings
-    settings = Settings()
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _database_dependencies():
+    """
+    Import the database connector and settings on first use
+    
+    Only training touches the database; deferring the import keeps the DB driver
+    out of startup for processes that only serve predictions.
+    """
+    try:
+        from ..database.db_connector import MillsDataConnector
+        from ...config.settings import settings
+    except ImportError:
+        # Fallback for direct testing
+        import sys
+        sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'database'))
+        sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
+        from db_connector import MillsDataConnector
+        from settings import Settings
+        settings = Settings()
+    return MillsDataConnector, settings
 
 # Create router with clean prefix for direct integration
 cascade_router = APIRouter(prefix="", tags=["cascade_optimization"])
@@ -49,6 +61,17 @@ cascade_router = APIRouter(prefix="", tags=["cascade_optimization"])
 classifier = VariableClassifier()
 model_manager: Optional[CascadeModelManager] = None
 gpr_model_manager: Optional[GPRCascadeModelManager] = None
+gpr_batcher: Optional[GPRPredictionBatcher] = None
+
+
+def _get_gpr_batcher() -> GPRPredictionBatcher:
+    """Prediction batcher bound to the currently loaded GPR model manager"""
+    global gpr_batcher
+    if gpr_batcher is None or gpr_batcher.model_manager is not gpr_model_manager:
+        if gpr_batcher is not None:
+            gpr_batcher.close()
+        gpr_batcher = GPRPredictionBatcher(gpr_model_manager)
+    return gpr_batcher
 
 # Request models
 class PredictionRequest(BaseModel):
@@ -84,6 +107,8 @@ class CascadeOptimizationRequest(BaseModel):
     model_type: str = Field("xgb", description="Model type: 'xgb' or 'gpr'")
     use_uncertainty: bool = Field(False, description="Use uncertainty-aware optimization (GPR only)")
     uncertainty_weight: float = Field(1.0, description="Weight for uncertainty penalty (GPR only)")
+    n_jobs: int = Field(1, description="Worker processes sharing one study (GPR only)")
+    storage: Optional[str] = Field(None, description="Optuna RDB URL for the shared study, e.g. 'sqlite:///gpr_study.db' (GPR only; temporary journal file when omitted)")
 
 class TargetDrivenOptimizationRequest(BaseModel):
     target_value: float = Field(..., description="Desired target value to achieve")
@@ -286,7 +311,8 @@ async def predict_cascade(request: PredictionRequest):
         
         # Call predict with appropriate parameters
         if request.model_type == "gpr":
-            result = current_manager.predict_cascade(
+            # Concurrent GPR requests are coalesced into batched GP predictions
+            result = await _get_gpr_batcher().predict(
                 request.mv_values, 
                 request.dv_values,
                 return_uncertainty=request.return_uncertainty
@@ -353,7 +379,8 @@ async def optimize_cascade(request: CascadeOptimizationRequest):
             dv_values=request.dv_values,
             target_variable=request.target_variable,
             maximize=request.maximize,
-            n_trials=request.n_trials
+            n_trials=request.n_trials,
+            mv_steps=classifier.get_mv_steps()
         )
         
         # Run optimization with appropriate optimizer
@@ -367,7 +394,9 @@ async def optimize_cascade(request: CascadeOptimizationRequest):
                 maximize=request.maximize,
                 n_trials=request.n_trials,
                 use_uncertainty=request.use_uncertainty,
-                uncertainty_weight=request.uncertainty_weight
+                uncertainty_weight=request.uncertainty_weight,
+                n_jobs=request.n_jobs,
+                storage=request.storage
             )
             optimizer = GPRCascadeOptimizer(current_manager)
             result = optimizer.optimize(gpr_opt_request)
@@ -454,7 +483,8 @@ async def optimize_for_target(request: TargetDrivenOptimizationRequest):
             cv_bounds=cv_bounds,
             dv_values=request.dv_values,
             n_trials=request.n_trials,
-            confidence_level=request.confidence_level
+            confidence_level=request.confidence_level,
+            mv_steps=classifier.get_mv_steps()
         )
         
         # Run target-driven optimization
@@ -530,9 +560,10 @@ async def _get_database_training_data(
     start_date: str = None,
     end_date: str = None,
     resample_freq: str = "1min"
-) -> Optional[pd.DataFrame]:
+) -> Optional["pd.DataFrame"]:
     """Get training data from database using common db_connector approach"""
     try:
+        MillsDataConnector, settings = _database_dependencies()
         db_connector = MillsDataConnector(
             host=settings.DB_HOST,
             port=settings.DB_PORT,
@@ -563,7 +594,7 @@ async def list_mill_models(model_type: str = "xgb"):
         base_path = os.path.abspath(base_path)
         
         if model_type == "gpr":
-            mill_models = GPRCascadeModelManager.list_mill_models(base_path)
+            mill_models = await GPRCascadeModelManager.list_mill_models_async(base_path)
         else:
             mill_models = CascadeModelManager.list_mill_models(base_path)
             # Additional sanitization to ensure JSON compliance
@@ -598,7 +629,7 @@ async def get_mill_model_info(mill_number: int, model_type: str = "xgb"):
         base_path = os.path.abspath(base_path)
         
         if model_type == "gpr":
-            mill_models = GPRCascadeModelManager.list_mill_models(base_path)
+            mill_models = await GPRCascadeModelManager.list_mill_models_async(base_path)
         else:
             mill_models = CascadeModelManager.list_mill_models(base_path)
         
@@ -613,7 +644,7 @@ async def get_mill_model_info(mill_number: int, model_type: str = "xgb"):
             if model_type == "gpr":
                 temp_manager = GPRCascadeModelManager(base_path, mill_number=mill_number)
             else:
-                temp_manager = CascadeModelManager(base_path, mill_number=mill_number)
+                temp_manager = CascadeModelManager(base_path, mill_number=mill_number, skip_mkdir=True)
             metadata = temp_manager.load_metadata()
             
             if metadata:
@@ -703,13 +734,18 @@ async def load_mill_model(mill_number: int, model_type: str = "xgb"):
         
         # Check if mill models exist
         if model_type == "gpr":
-            mill_models = GPRCascadeModelManager.list_mill_models(base_path)
+            mill_models = await GPRCascadeModelManager.list_mill_models_async(base_path)
             if mill_number not in mill_models:
                 raise HTTPException(status_code=404, detail=f"No GPR models found for Mill {mill_number}")
             
-            # Initialize GPR model manager and load models
-            gpr_model_manager = GPRCascadeModelManager(base_path, mill_number=mill_number)
-            success = gpr_model_manager.load_models()
+            # Reuse the process-level cached manager - models are unpickled again only when
+            # retrained on disk; the load runs off the event loop
+            loaded_manager = await asyncio.get_running_loop().run_in_executor(
+                None, GPRCascadeModelManager.get_or_load, base_path, mill_number
+            )
+            success = loaded_manager is not None
+            if success:
+                gpr_model_manager = loaded_manager
             current_manager = gpr_model_manager
         else:
             mill_models = CascadeModelManager.list_mill_models(base_path)
@@ -717,7 +753,7 @@ async def load_mill_model(mill_number: int, model_type: str = "xgb"):
                 raise HTTPException(status_code=404, detail=f"No XGBoost models found for Mill {mill_number}")
             
             # Initialize XGBoost model manager and load models
-            model_manager = CascadeModelManager(base_path, mill_number=mill_number)
+            model_manager = CascadeModelManager(base_path, mill_number=mill_number, skip_mkdir=True)
             success = model_manager.load_models()
             current_manager = model_manager
         
@@ -755,7 +791,7 @@ async def health_check():
     
     # Get GPR models
     try:
-        gpr_mill_models = GPRCascadeModelManager.list_mill_models(base_path)
+        gpr_mill_models = await GPRCascadeModelManager.list_mill_models_async(base_path)
         available_gpr_mills = list(gpr_mill_models.keys())
     except Exception:
         available_gpr_mills = []
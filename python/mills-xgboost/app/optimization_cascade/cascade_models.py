@@ -9,15 +9,172 @@ import pandas as pd
 import xgboost as xgb
 from typing import Dict, List, Optional, Any
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.preprocessing import StandardScaler
 import joblib
+from joblib import Parallel, delayed
 import os
 import json
 import math
+import mmap
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
-from .variable_classifier import VariableClassifier, VariableType
+from .variable_classifier import VariableClassifier, VariableType, get_default_classifier
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - fall back to the numpy implementation
+    njit = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib json module
+    orjson = None
+
+
+def _load_json_file(path: str) -> Any:
+    """Parse a JSON file, using orjson when available"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity tokens written by older stdlib json dumps
+    return json.loads(raw)
+
+
+def _dump_json_file(obj: Any, path: str):
+    """Write obj as indented JSON, using orjson when available (NaN/Infinity become null)"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _feasibility_mask(cv_mat, lo, hi):
+        """Row-wise check that every CV lies within [lo, hi] (NaN counts as infeasible)"""
+        n, m = cv_mat.shape
+        out = np.empty(n, dtype=np.bool_)
+        for i in range(n):
+            ok = True
+            for j in range(m):
+                v = cv_mat[i, j]
+                if not (lo[j] <= v <= hi[j]):
+                    ok = False
+                    break
+            out[i] = ok
+        return out
+else:
+    def _feasibility_mask(cv_mat, lo, hi):
+        """Row-wise check that every CV lies within [lo, hi] (NaN counts as infeasible)"""
+        return ((cv_mat >= lo) & (cv_mat <= hi)).all(axis=1)
+
+
+# Model/scaler pickles: uncompressed, protocol 5 (PEP 574) so large buffers such as
+# scaler arrays and the booster's raw model bytes are written without extra copies
+_PICKLE_PROTOCOL = 5
+
+
+def _load_model_file(path: str) -> Any:
+    """
+    joblib.load() a model/scaler pickle through a read-only memory map
+    
+    The unpickler reads straight from the page cache rather than through a
+    buffered file copy, so repeated loads of the same mill are served from cached
+    pages and the kernel reads ahead sequentially. Empty files (which can't be
+    mapped) fall back to a plain joblib.load().
+    """
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            return joblib.load(mm)
+    except (ValueError, OSError):
+        return joblib.load(path)
+
+
+@lru_cache(maxsize=1)
+def _classifier_defaults():
+    """
+    Default feature ids, DV parameters and CV constraints of the shared classifier
+    
+    Resolved once per process and shared by all managers (read-only).
+    """
+    classifier = get_default_classifier()
+    default_features = {
+        'mvs': [mv.id for mv in classifier.get_mvs()],
+        'cvs': [cv.id for cv in classifier.get_cvs()],
+        'dvs': [dv.id for dv in classifier.get_dvs()],
+        'targets': [target.id for target in classifier.get_targets()]
+    }
+    dv_params = {dv.id: dv for dv in classifier.get_dvs()}
+    return default_features, dv_params, classifier.get_cv_constraints()
+
+
+_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+
+def _pin_single_thread():
+    """
+    Limit OpenMP/BLAS thread pools of the current worker process to one thread
+    
+    For tree-ensemble fitting, many single-threaded workers beat a few workers
+    that each spawn a full thread pool (n_workers x n_cores threads thrash).
+    """
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = '1'
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=1)
+    except ImportError:
+        pass
+
+
+def _fit_process_model_pinned(*args, **kwargs):
+    """_fit_process_model() for a parallel worker, with thread pools pinned to one thread"""
+    _pin_single_thread()
+    return _fit_process_model(*args, **kwargs)
+
+
+def _fit_process_model(X: np.ndarray, y: np.ndarray, test_size: float,
+                       model_config: Dict[str, Any], contiguous_split: bool = False):
+    """
+    Fit one MV → CV process model (module-level so joblib workers can pickle it)
+    
+    Returns:
+        Tuple of (model, scaler, y_test, y_pred)
+    """
+    # Train-test split
+    if contiguous_split:
+        # Chronological tail as test set - slices are views, no gather copies.
+        # At least one test sample: X[:-0] would be empty and X[-0:] everything.
+        if len(X) < 2:
+            raise ValueError(f"Contiguous split needs at least 2 samples, got {len(X)}")
+        n_test = min(max(1, int(len(X) * test_size)), len(X) - 1)
+        X_train, X_test = X[:-n_test], X[-n_test:]
+        y_train, y_test = y[:-n_test], y[-n_test:]
+    else:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=42
+        )
+    
+    # Scale features
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    
+    # Train model
+    model = xgb.XGBRegressor(**model_config)
+    model.fit(X_train_scaled, y_train)
+    
+    return model, scaler, y_test, model.predict(X_test_scaled)
 
 class CascadeModelManager:
     """
@@ -26,8 +183,18 @@ class CascadeModelManager:
     - Quality model (CV + DV → Target)
     """
     
-    def __init__(self, model_save_path: str = "cascade_models", mill_number: Optional[int] = None):
-        self.classifier = VariableClassifier()
+    def __init__(self, model_save_path: Optional[str] = "cascade_models", mill_number: Optional[int] = None,
+                 skip_mkdir: bool = False):
+        """
+        Args:
+            model_save_path: Base directory for model artifacts. Pass None for an
+                             in-memory manager (e.g. throwaway validation runs) that
+                             trains and predicts without any pickle/JSON disk IO.
+            mill_number: Mill number; models are stored in a mill_<n> subdirectory
+            skip_mkdir: Don't create the model directory; for read-only managers over
+                        existing models, or when the caller has created it already
+        """
+        self.classifier = get_default_classifier()
         self.base_model_path = model_save_path
         self.mill_number = mill_number
         self.process_models = {}  # MV → CV models
@@ -42,14 +209,18 @@ class CascadeModelManager:
             'target': None
         }
         
+        # Classifier defaults are static - resolved once per process and shared
+        self._default_features, self._dv_params, self._cv_constraints = _classifier_defaults()
+        
         # Set mill-specific model save path
-        if mill_number:
+        if mill_number and model_save_path is not None:
             self.model_save_path = os.path.join(model_save_path, f"mill_{mill_number}")
         else:
             self.model_save_path = model_save_path
             
         # Create model save directory
-        os.makedirs(self.model_save_path, exist_ok=True)
+        if self.model_save_path is not None and not skip_mkdir:
+            os.makedirs(self.model_save_path, exist_ok=True)
         
         # Initialize metadata
         self.metadata = {
@@ -98,16 +269,20 @@ class CascadeModelManager:
             self.configured_features['target'] = target_variable
             print(f"Configured Target: {target_variable}")
     
+    def _feature_ids(self, kind: str) -> List[str]:
+        """Configured feature ids of the given kind ('mvs', 'cvs', 'dvs'), or the classifier defaults"""
+        return self.configured_features[kind] or self._default_features[kind]
+    
     def prepare_training_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Prepare training data by separating MVs, CVs, DVs, and targets
         Uses configured features if available, otherwise falls back to classifier defaults
         """
         # Use configured features if available, otherwise use classifier defaults
-        mvs = self.configured_features['mvs'] or [mv.id for mv in self.classifier.get_mvs()]
-        cvs = self.configured_features['cvs'] or [cv.id for cv in self.classifier.get_cvs()]
-        dvs = self.configured_features['dvs'] or [dv.id for dv in self.classifier.get_dvs()]
-        targets = [self.configured_features['target']] if self.configured_features['target'] else [target.id for target in self.classifier.get_targets()]
+        mvs = self._feature_ids('mvs')
+        cvs = self._feature_ids('cvs')
+        dvs = self._feature_ids('dvs')
+        targets = [self.configured_features['target']] if self.configured_features['target'] else self._default_features['targets']
         
         # Filter to only include columns that exist in the data
         available_mvs = [col for col in mvs if col in df.columns]
@@ -149,44 +324,93 @@ class CascadeModelManager:
             'target_data': df[available_targets] if available_targets else pd.DataFrame()
         }
     
-    def train_process_models(self, df: pd.DataFrame, test_size: float = 0.2) -> Dict[str, Any]:
+    @staticmethod
+    def _metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+        """
+        Regression metrics computed from a single residual vector
+        
+        Args:
+            y_true: Actual values
+            y_pred: Predicted values
+            
+        Returns:
+            Dictionary with r2_score, rmse and mae
+        """
+        y_true = np.asarray(y_true, dtype=np.float64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        n = len(y_true)
+        
+        # Residual computed once into its own buffer; RMSE via a single BLAS dot product
+        resid = np.subtract(y_true, y_pred, out=np.empty_like(y_true))
+        ss_res = float(np.dot(resid, resid))
+        rmse = float(np.sqrt(ss_res / n))
+        mae = float(np.abs(resid, out=resid).mean())  # resid is not needed past this point
+        
+        # R² from the same residual sum of squares (no sklearn input validation per call).
+        # A constant target follows sklearn's convention: 1.0 for a perfect fit, else 0.0
+        centered = y_true - y_true.mean()
+        ss_tot = float(np.dot(centered, centered))
+        if ss_tot > 0:
+            r2 = 1.0 - ss_res / ss_tot
+        else:
+            r2 = 1.0 if ss_res == 0 else 0.0
+        
+        return {
+            'r2_score': r2,
+            'rmse': rmse,
+            'mae': mae
+        }
+    
+    def train_process_models(self, df: pd.DataFrame, test_size: float = 0.2,
+                             n_jobs: int = 1, contiguous_split: bool = False,
+                             include_feature_importance: bool = True) -> Dict[str, Any]:
         """
         Train individual process models: MV → CV
         Each CV gets its own model predicting from MVs
+        
+        Args:
+            df: Training dataframe
+            test_size: Test split ratio
+            n_jobs: Number of worker processes for fitting the (independent)
+                    per-CV models. With n_jobs != 1 each XGBoost model is
+                    pinned to a single thread to avoid oversubscription.
+            contiguous_split: Hold out the chronological tail (as the quality
+                    model does) instead of a shuffled split. Train/test sets
+                    become views rather than copies; scores may be more
+                    pessimistic since there is no shuffling.
+            include_feature_importance: Compute per-MV feature importances
+                    (walks every tree of each model; skip when only metrics are needed)
         """
         print("=== TRAINING PROCESS MODELS (MV → CV) ===")
         
         data = self.prepare_training_data(df)
         mvs = data['mvs']
         cvs = data['cvs']
+        # All MVs as features - converted once to a contiguous float32 matrix
+        # (XGBoost works in float32 internally, so this halves memory traffic at no accuracy cost)
+        X = np.ascontiguousarray(data['mv_data'].to_numpy(dtype=np.float32))
+        # Targets stay float64 so the stored R²/RMSE/MAPE are computed at full precision
+        targets = {cv_id: df[cv_id].to_numpy(dtype=np.float64) for cv_id in cvs}
+        
+        if n_jobs == 1:
+            fitted = [_fit_process_model(X, targets[cv_id], test_size, self.model_config, contiguous_split)
+                      for cv_id in cvs]
+        else:
+            print(f"Fitting {len(cvs)} process models in parallel (n_jobs={n_jobs})")
+            worker_config = {**self.model_config, 'n_jobs': 1}
+            fitted = Parallel(n_jobs=n_jobs, backend='loky')(
+                delayed(_fit_process_model_pinned)(X, targets[cv_id], test_size, worker_config, contiguous_split)
+                for cv_id in cvs
+            )
         
         results = {}
         
-        for cv_id in cvs:
-            print(f"\nTraining model: MVs → {cv_id}")
-            
-            # Prepare features and target
-            X = data['mv_data']  # All MVs as features
-            y = df[cv_id]  # Current CV as target
-            
-            # Train-test split
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=42
-            )
-            
-            # Scale features
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-            
-            # Train model
-            model = xgb.XGBRegressor(**self.model_config)
-            model.fit(X_train_scaled, y_train)
+        for cv_id, (model, scaler, y_test, y_pred) in zip(cvs, fitted):
+            print(f"\nTrained model: MVs → {cv_id}")
             
             # Evaluate
-            y_pred = model.predict(X_test_scaled)
-            r2 = r2_score(y_test, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+            metrics = self._metrics(y_test, y_pred)
+            r2, rmse = metrics['r2_score'], metrics['rmse']
             
             # Store model and scaler
             self.process_models[cv_id] = model
@@ -196,7 +420,7 @@ class CascadeModelManager:
             results[cv_id] = {
                 'r2_score': r2,
                 'rmse': rmse,
-                'feature_importance': dict(zip(mvs, model.feature_importances_)),
+                'feature_importance': dict(zip(mvs, model.feature_importances_)) if include_feature_importance else {},
                 'model_type': 'process_model',
                 'input_vars': mvs,
                 'output_var': cv_id
@@ -206,10 +430,11 @@ class CascadeModelManager:
             print(f"  RMSE: {rmse:.4f}")
             
             # Save model
-            model_path = os.path.join(self.model_save_path, f"process_model_{cv_id}.pkl")
-            scaler_path = os.path.join(self.model_save_path, f"scaler_mv_to_{cv_id}.pkl")
-            joblib.dump(model, model_path)
-            joblib.dump(scaler, scaler_path)
+            if self.model_save_path is not None:
+                model_path = os.path.join(self.model_save_path, f"process_model_{cv_id}.pkl")
+                scaler_path = os.path.join(self.model_save_path, f"scaler_mv_to_{cv_id}.pkl")
+                joblib.dump(model, model_path, compress=0, protocol=_PICKLE_PROTOCOL)
+                joblib.dump(scaler, scaler_path, compress=0, protocol=_PICKLE_PROTOCOL)
             
             # Update metadata with actual features used (configured or default)
             actual_mvs = self.configured_features['mvs'] or mvs
@@ -224,10 +449,17 @@ class CascadeModelManager:
         print(f"\nProcess models training completed. {len(results)} models trained.")
         return results
     
-    def train_quality_model(self, df: pd.DataFrame, test_size: float = 0.2) -> Dict[str, Any]:
+    def train_quality_model(self, df: pd.DataFrame, test_size: float = 0.2,
+                            include_feature_importance: bool = True) -> Dict[str, Any]:
         """
         Train quality model: CV + DV → Target
         Uses REAL measured CVs and DVs to predict target quality
+        
+        Args:
+            df: Training dataframe
+            test_size: Test split ratio
+            include_feature_importance: Compute per-feature importances
+                    (walks every tree; skip when only metrics are needed)
         """
         print("\n=== TRAINING QUALITY MODEL (CV + DV → Target) ===")
         
@@ -245,8 +477,8 @@ class CascadeModelManager:
         
         # Prepare features (CVs + DVs) and target
         feature_cols = cvs + dvs
-        X = df[feature_cols]  # Real measured CVs + DVs
-        y = df[primary_target]  # Target quality
+        X = np.ascontiguousarray(df[feature_cols].to_numpy(dtype=np.float32))  # Real measured CVs + DVs
+        y = df[primary_target].to_numpy(dtype=np.float64)  # Target quality (full precision for metrics)
         
         # Train-test split - no shuffling for time series data
         test_size = int(len(X) * test_size)
@@ -264,15 +496,15 @@ class CascadeModelManager:
         
         # Evaluate
         y_pred = model.predict(X_test_scaled)
-        r2 = r2_score(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        metrics = self._metrics(y_test, y_pred)
+        r2, rmse = metrics['r2_score'], metrics['rmse']
         
         # Store model and scaler
         self.quality_model = model
         self.scalers['quality_model'] = scaler
         
         # Feature importance
-        feature_importance = dict(zip(feature_cols, model.feature_importances_))
+        feature_importance = dict(zip(feature_cols, model.feature_importances_)) if include_feature_importance else {}
         
         results = {
             'r2_score': r2,
@@ -287,15 +519,17 @@ class CascadeModelManager:
         
         print(f"Quality Model R² Score: {r2:.4f}")
         print(f"Quality Model RMSE: {rmse:.4f}")
-        print("\nFeature Importance:")
-        for feature, importance in sorted(feature_importance.items(), key=lambda x: x[1], reverse=True):
-            print(f"  {feature}: {importance:.4f}")
+        if feature_importance:
+            print("\nFeature Importance:")
+            for feature, importance in sorted(feature_importance.items(), key=lambda x: x[1], reverse=True):
+                print(f"  {feature}: {importance:.4f}")
         
         # Save model
-        model_path = os.path.join(self.model_save_path, "quality_model.pkl")
-        scaler_path = os.path.join(self.model_save_path, "scaler_quality_model.pkl")
-        joblib.dump(model, model_path)
-        joblib.dump(scaler, scaler_path)
+        if self.model_save_path is not None:
+            model_path = os.path.join(self.model_save_path, "quality_model.pkl")
+            scaler_path = os.path.join(self.model_save_path, "scaler_quality_model.pkl")
+            joblib.dump(model, model_path, compress=0, protocol=_PICKLE_PROTOCOL)
+            joblib.dump(scaler, scaler_path, compress=0, protocol=_PICKLE_PROTOCOL)
         
         # Update metadata with actual features used (configured or default)
         actual_cvs = self.configured_features['cvs'] or cvs
@@ -435,7 +669,11 @@ class CascadeModelManager:
     def train_all_models(
         self, 
         df: pd.DataFrame, 
-        test_size: float = 0.2
+        test_size: float = 0.2,
+        n_jobs: int = 1,
+        contiguous_split: bool = False,
+        include_feature_importance: bool = True,
+        store_pointwise: bool = True
     ) -> Dict[str, Any]:
         """
         Train complete cascade: process models + quality model
@@ -443,6 +681,10 @@ class CascadeModelManager:
         Args:
             df: Input dataframe (already filtered by bounds if needed)
             test_size: Test split ratio
+            n_jobs: Worker processes for fitting the process models in parallel
+            contiguous_split: Use a chronological (unshuffled) split for the process models
+            include_feature_importance: Compute feature importances for all models
+            store_pointwise: Keep per-sample chain validation predictions/actuals in the results
 
         Note: Data filtering by bounds should be done before calling this method.
         """
@@ -482,14 +724,17 @@ class CascadeModelManager:
         print(f"✅ Data cleaning completed: {df_clean.shape}")
         
         # Train process models
-        process_results = self.train_process_models(df_clean, test_size)
+        process_results = self.train_process_models(df_clean, test_size, n_jobs=n_jobs,
+                                                    contiguous_split=contiguous_split,
+                                                    include_feature_importance=include_feature_importance)
         
         # Train quality model
-        quality_results = self.train_quality_model(df_clean, test_size)
+        quality_results = self.train_quality_model(df_clean, test_size,
+                                                   include_feature_importance=include_feature_importance)
         
         # Validate complete chain with error handling
         try:
-            chain_results = self.validate_complete_chain(df_clean)
+            chain_results = self.validate_complete_chain(df_clean, store_pointwise=store_pointwise)
         except Exception as e:
             print(f"Warning: Chain validation failed: {e}")
             # Create dummy chain results so training can complete
@@ -556,17 +801,19 @@ class CascadeModelManager:
         }
         
         # Save training results
-        results_path = os.path.join(self.model_save_path, "training_results.json")
-        with open(results_path, 'w') as f:
+        if self.model_save_path is not None:
+            results_path = os.path.join(self.model_save_path, "training_results.json")
             # Convert numpy types to native Python types for JSON serialization
             json_results = self._convert_for_json(results)
-            json.dump(json_results, f, indent=2)
+            _dump_json_file(json_results, results_path)
+        else:
+            results_path = None
         
         print(f"\n=== TRAINING COMPLETED ===")
         print(f"Process models: {len(process_results)} trained")
         print(f"Quality model: trained")
         print(f"Chain validation R²: {chain_results['r2_score']:.4f}")
-        print(f"Results saved to: {results_path}")
+        print(f"Results saved to: {results_path or 'memory only (no model_save_path)'}")
         
         return results
     
@@ -585,33 +832,33 @@ class CascadeModelManager:
             raise ValueError("Models not trained. Call train_all_models() first.")
         
         # Use configured features if available, otherwise fall back to classifier defaults
-        mvs = self.configured_features['mvs'] or [mv.id for mv in self.classifier.get_mvs()]
-        cvs = self.configured_features['cvs'] or [cv.id for cv in self.classifier.get_cvs()]
-        dvs = self.configured_features['dvs'] or [dv.id for dv in self.classifier.get_dvs()]
+        mvs = self._feature_ids('mvs')
+        cvs = self._feature_ids('cvs')
+        dvs = self._feature_ids('dvs')
         
         # Step 1: Predict CVs from MVs using process models
-        # Create DataFrame with proper feature names to avoid sklearn warnings
         try:
-            mv_df = pd.DataFrame([[mv_values[mv_id] for mv_id in mvs]], columns=mvs)
+            mv_row = np.array([[mv_values[mv_id] for mv_id in mvs]], dtype=np.float64)
         except KeyError as e:
             print(f"❌ Prediction error: {e}")
             print(f"   Available MV keys in request: {list(mv_values.keys())}")
             print(f"   Required MV keys from model: {mvs}")
             raise
         predicted_cvs = {}
+        scaled_cache = {}
         
         for cv_id in cvs:
             if cv_id in self.process_models:
-                # Scale input using DataFrame with feature names
+                # Scale input (shared across process models with identical scalers)
                 scaler = self.scalers[f"mv_to_{cv_id}"]
-                mv_scaled = scaler.transform(mv_df)
+                mv_scaled = self._scale_cached(scaler, mv_row, scaled_cache)
                 
                 # Predict
-                cv_pred = self.process_models[cv_id].predict(mv_scaled)[0]
+                cv_pred = self._predict(self.process_models[cv_id], mv_scaled)[0]
                 predicted_cvs[cv_id] = cv_pred
         
         # Step 2: Check CV constraints (feasibility)
-        cv_constraints = self.classifier.get_cv_constraints()
+        cv_constraints = self._cv_constraints
         is_feasible = True
         constraint_violations = []
         
@@ -652,24 +899,7 @@ class CascadeModelManager:
                 else:
                     # Feature is missing - use a fallback value
                     missing_features.append(col)
-                    
-                    # Try to get default value from classifier or use midpoint of bounds
-                    fallback_value = None
-                    
-                    # Check if it's a DV and get its default from classifier
-                    if col in [dv.id for dv in self.classifier.get_dvs()]:
-                        dv_param = next((dv for dv in self.classifier.get_dvs() if dv.id == col), None)
-                        if dv_param and hasattr(dv_param, 'initialBounds'):
-                            min_val, max_val = dv_param.initialBounds
-                            fallback_value = (min_val + max_val) / 2
-                            print(f"⚠️ Missing DV '{col}' - using midpoint fallback: {fallback_value:.2f}")
-                    
-                    # If still no fallback, use 0
-                    if fallback_value is None:
-                        fallback_value = 0.0
-                        print(f"⚠️ Missing feature '{col}' - using zero fallback")
-                    
-                    quality_features.append(fallback_value)
+                    quality_features.append(self._fallback_feature_value(col))
             
             if missing_features:
                 print(f"⚠️ Quality model prediction with missing features: {missing_features}")
@@ -678,13 +908,13 @@ class CascadeModelManager:
                 print(f"   Provided DVs: {list(dv_values.keys())}")
                 print(f"   Using fallback values for missing features")
             
-            quality_df = pd.DataFrame([quality_features], columns=feature_cols)
+            quality_row = np.array([quality_features], dtype=np.float64)
             
             # Scale and predict
             quality_scaler = self.scalers['quality_model']
-            quality_scaled = quality_scaler.transform(quality_df)
+            quality_scaled = self._scale(quality_scaler, quality_row)
             
-            predicted_target = self.quality_model.predict(quality_scaled)[0]
+            predicted_target = self._predict(self.quality_model, quality_scaled)[0]
         else:
             predicted_target = 999.0  # High penalty for infeasible solutions
         
@@ -697,9 +927,187 @@ class CascadeModelManager:
             'dv_inputs': dv_values
         }
     
-    def validate_complete_chain(self, df: pd.DataFrame, n_samples: int = 200) -> Dict[str, Any]:
+    @staticmethod
+    def _scale(scaler: StandardScaler, X: np.ndarray) -> np.ndarray:
+        """
+        Transform a numpy feature matrix with a fitted scaler
+        
+        Scalers are fitted on plain numpy matrices. Scalers saved by older versions
+        were fitted on DataFrames and expect named columns, so those get a
+        lightweight wrapper to avoid sklearn feature-name warnings.
+        """
+        if hasattr(scaler, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=scaler.feature_names_in_)
+        return scaler.transform(X)
+    
+    @staticmethod
+    def _predict(model, X: np.ndarray) -> np.ndarray:
+        """
+        Predict with an XGBoost model through its booster's inplace_predict()
+        
+        inplace_predict() reads the numpy matrix directly instead of building a
+        DMatrix per call, the documented fast path for many small predictions.
+        Models are trained without early stopping, so all trees are used either way.
+        
+        The input is handed over as float32: XGBoost compares features in float32
+        internally, so predictions are unchanged while half the bytes are moved.
+        """
+        try:
+            return model.get_booster().inplace_predict(np.ascontiguousarray(X, dtype=np.float32))
+        except (AttributeError, TypeError, xgb.core.XGBoostError):
+            # Not an XGBoost model, or an xgboost version without inplace_predict
+            return model.predict(X)
+    
+    @classmethod
+    def _scale_cached(cls, scaler: StandardScaler, X: np.ndarray, cache: Dict[Any, np.ndarray]) -> np.ndarray:
+        """
+        _scale() memoized on the scaler's fitted parameters
+        
+        All MV → CV scalers are fitted on the same MV columns and the same split,
+        so they usually carry identical parameters; the MV matrix is then only
+        transformed once per prediction instead of once per process model.
+        """
+        mean, scale = getattr(scaler, 'mean_', None), getattr(scaler, 'scale_', None)
+        if mean is None or scale is None:
+            return cls._scale(scaler, X)
+        key = (mean.tobytes(), scale.tobytes())
+        if key not in cache:
+            cache[key] = cls._scale(scaler, X)
+        return cache[key]
+    
+    def _fallback_feature_value(self, col: str) -> float:
+        """Fallback value for a quality-model feature missing from the inputs"""
+        # Try to get default value from classifier or use midpoint of bounds
+        fallback_value = None
+        
+        # Check if it's a DV and get its default from classifier
+        dv_param = self._dv_params.get(col)
+        if dv_param is not None and hasattr(dv_param, 'initialBounds'):
+            min_val, max_val = dv_param.initialBounds
+            fallback_value = (min_val + max_val) / 2
+            print(f"⚠️ Missing DV '{col}' - using midpoint fallback: {fallback_value:.2f}")
+        
+        # If still no fallback, use 0
+        if fallback_value is None:
+            fallback_value = 0.0
+            print(f"⚠️ Missing feature '{col}' - using zero fallback")
+        
+        return fallback_value
+    
+    def predict_cascade_batch(self, mv_matrix: np.ndarray,
+                              dv_values: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Batched cascade prediction: MVs → CVs → Target for many samples at once
+        
+        Equivalent to calling predict_cascade() per row, but scales and predicts
+        each model once over the whole matrix.
+        
+        Args:
+            mv_matrix: Array of shape (n_samples, n_mvs), columns in model MV order
+            dv_values: DV values, each a scalar shared by all samples or an
+                       array of length n_samples
+            
+        Returns:
+            Dictionary with per-sample arrays of predicted CVs, target and feasibility
+        """
+        if not self.process_models or not self.quality_model:
+            raise ValueError("Models not trained. Call train_all_models() first.")
+        
+        mvs = self._feature_ids('mvs')
+        cvs = self._feature_ids('cvs')
+        dvs = self._feature_ids('dvs')
+        dv_values = dv_values or {}
+        
+        mv_matrix = np.asarray(mv_matrix, dtype=np.float64)
+        if mv_matrix.ndim != 2 or mv_matrix.shape[1] != len(mvs):
+            raise ValueError(f"Expected MV matrix of shape (n_samples, {len(mvs)}) in order {mvs}, got {mv_matrix.shape}")
+        n_samples = mv_matrix.shape[0]
+        
+        # Step 1: Predict CVs from MVs using process models (one call per model),
+        # written straight into a preallocated (n_samples, n_cvs) buffer
+        cv_order = [cv_id for cv_id in cvs if cv_id in self.process_models]
+        cv_matrix = np.empty((n_samples, len(cv_order)), dtype=np.float64)
+        scaled_cache = {}
+        for j, cv_id in enumerate(cv_order):
+            mv_scaled = self._scale_cached(self.scalers[f"mv_to_{cv_id}"], mv_matrix, scaled_cache)
+            cv_matrix[:, j] = self._predict(self.process_models[cv_id], mv_scaled)
+        predicted_cvs = {cv_id: cv_matrix[:, j] for j, cv_id in enumerate(cv_order)}
+        
+        # Step 2: CV constraint check over the whole prediction matrix
+        # (unconstrained CVs get infinite bounds)
+        cv_constraints = self._cv_constraints
+        lo = np.array([cv_constraints.get(cv_id, (-np.inf, np.inf))[0] for cv_id in cv_order], dtype=np.float64)
+        hi = np.array([cv_constraints.get(cv_id, (-np.inf, np.inf))[1] for cv_id in cv_order], dtype=np.float64)
+        is_feasible = _feasibility_mask(cv_matrix, lo, hi)
+        
+        # Step 3: Predict target quality for feasible samples
+        if 'quality_model' in self.metadata.get('model_performance', {}):
+            feature_cols = self.metadata['model_performance']['quality_model']['input_vars']
+        else:
+            feature_cols = cvs + dvs
+        
+        quality_matrix = np.empty((n_samples, len(feature_cols)), dtype=np.float64)
+        for j, col in enumerate(feature_cols):
+            # DV inputs take precedence over predicted CVs, as in predict_cascade
+            if col in dv_values:
+                quality_matrix[:, j] = dv_values[col]
+            elif col in predicted_cvs:
+                quality_matrix[:, j] = predicted_cvs[col]
+            else:
+                quality_matrix[:, j] = self._fallback_feature_value(col)
+        
+        predicted_target = np.full(n_samples, 999.0)  # High penalty for infeasible solutions
+        if is_feasible.any():
+            quality_scaled = self._scale(self.scalers['quality_model'], quality_matrix[is_feasible])
+            predicted_target[is_feasible] = self._predict(self.quality_model, quality_scaled)
+        
+        return {
+            'predicted_cvs': predicted_cvs,
+            'cv_matrix': cv_matrix,
+            'cv_order': cv_order,
+            'predicted_target': predicted_target,
+            'is_feasible': is_feasible
+        }
+    
+    def predict_cascade_array(self, mv_mat: np.ndarray, dv_mat: Optional[np.ndarray],
+                              mv_order: List[str], dv_order: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Batched cascade prediction from raw arrays with caller-defined column order
+        
+        Args:
+            mv_mat: Array of shape (n_samples, len(mv_order)) with MV values
+            dv_mat: Array of shape (n_samples, len(dv_order)) with DV values, or None
+            mv_order: MV ids matching the columns of mv_mat
+            dv_order: DV ids matching the columns of dv_mat
+            
+        Returns:
+            Same per-sample arrays as predict_cascade_batch()
+        """
+        mvs = self._feature_ids('mvs')
+        mv_mat = np.asarray(mv_mat, dtype=np.float64)
+        if list(mv_order) != list(mvs):
+            missing = [mv_id for mv_id in mvs if mv_id not in mv_order]
+            if missing:
+                raise ValueError(f"MV matrix is missing model inputs: {missing}")
+            mv_mat = mv_mat[:, [list(mv_order).index(mv_id) for mv_id in mvs]]
+        
+        dv_values = {}
+        if dv_mat is not None and dv_order:
+            dv_mat = np.asarray(dv_mat, dtype=np.float64)
+            dv_values = {dv_id: dv_mat[:, j] for j, dv_id in enumerate(dv_order)}
+        
+        return self.predict_cascade_batch(mv_mat, dv_values)
+    
+    def validate_complete_chain(self, df: pd.DataFrame, n_samples: int = 200,
+                                store_pointwise: bool = True) -> Dict[str, Any]:
         """
         Validate the complete MV → CV → Target prediction chain
+        
+        Args:
+            df: Validation dataframe
+            n_samples: Number of random samples to validate on
+            store_pointwise: Include per-sample predictions/actuals in the results;
+                    disable when only aggregate metrics are needed
         """
         print(f"\n=== VALIDATING COMPLETE CHAIN (n={n_samples}) ===")
         
@@ -707,41 +1115,72 @@ class CascadeModelManager:
             raise ValueError("Models not trained. Call train_all_models() first.")
         
         data = self.prepare_training_data(df)
-        mvs = data['mvs']
         dvs = data['dvs']
+        mvs = self._feature_ids('mvs')
         
         # Select random samples
         n_samples = min(n_samples, len(df))
         test_indices = np.random.choice(len(df), n_samples, replace=False)
         test_data = df.iloc[test_indices]
         
-        predictions = []
-        actuals = []
-        
-        for idx, row in test_data.iterrows():
-            try:
-                # Get actual MV and DV values
-                mv_values = {mv_id: row[mv_id] for mv_id in mvs}
-                dv_values = {dv_id: row[dv_id] for dv_id in dvs}  # Empty dict if no DVs
-                
-                # Predict using cascade
-                result = self.predict_cascade(mv_values, dv_values)
-                
-                predictions.append(result['predicted_target'])
-                actuals.append(row['PSI200'])  # Primary target
-            except Exception as e:
-                print(f"Warning: Validation failed for sample {idx}: {e}")
-                # Skip this sample and continue
-                continue
+        # Predict all samples in one batched pass through the cascade
+        try:
+            mv_mat = test_data[mvs].to_numpy(dtype=np.float64)
+            dv_mat = test_data[dvs].to_numpy(dtype=np.float64) if dvs else None
+            actuals = test_data['PSI200'].to_numpy(dtype=np.float64)  # Primary target
+            
+            # Rows with missing/non-finite inputs or target would fail (or poison) the
+            # batch - skip them individually, as the per-row validation did
+            valid = np.isfinite(mv_mat).all(axis=1) & np.isfinite(actuals)
+            if dv_mat is not None:
+                valid &= np.isfinite(dv_mat).all(axis=1)
+            n_invalid = int((~valid).sum())
+            if n_invalid:
+                print(f"Warning: Skipping {n_invalid} validation samples with missing or non-finite values")
+                test_data = test_data[valid]
+                mv_mat, actuals = mv_mat[valid], actuals[valid]
+                dv_mat = dv_mat[valid] if dv_mat is not None else None
+            
+            if len(test_data):
+                result = self.predict_cascade_array(mv_mat, dv_mat, mvs, dvs)
+                predictions = result['predicted_target']
+            else:
+                result = None
+                predictions = np.empty(0)
+            
+            # Per-CV accuracy of the process models, column-wise over the dense prediction matrix
+            cv_order = [cv_id for cv_id in result['cv_order'] if cv_id in test_data.columns] if result else []
+            cv_accuracy = {}
+            if cv_order:
+                cv_pred_mat = result['cv_matrix'][:, [result['cv_order'].index(cv_id) for cv_id in cv_order]]
+                cv_actual_mat = test_data[cv_order].to_numpy(dtype=np.float64)
+                # Only rows with all measured CVs present enter the CV metrics
+                cv_rows = np.isfinite(cv_actual_mat).all(axis=1)
+                cv_pred_mat, cv_actual_mat = cv_pred_mat[cv_rows], cv_actual_mat[cv_rows]
+                if cv_rows.any():
+                    resid = np.subtract(cv_actual_mat, cv_pred_mat, out=cv_pred_mat)
+                    ss_res = np.einsum('ij,ij->j', resid, resid)
+                    ss_tot = ((cv_actual_mat - cv_actual_mat.mean(axis=0)) ** 2).sum(axis=0)
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        cv_r2 = 1.0 - ss_res / ss_tot
+                    cv_rmse = np.sqrt(ss_res / len(cv_actual_mat))
+                    cv_accuracy = {
+                        cv_id: {'r2_score': float(r2_cv), 'rmse': float(rmse_cv)}
+                        for cv_id, r2_cv, rmse_cv in zip(cv_order, cv_r2, cv_rmse)
+                    }
+        except Exception as e:
+            print(f"Warning: Batched chain validation failed: {e}")
+            predictions = np.empty(0)
+            actuals = np.empty(0)
+            cv_accuracy = {}
         
         # Calculate chain performance (only if we have predictions)
         if len(predictions) == 0:
             print("Warning: No successful predictions in chain validation")
             r2, rmse, mae = 0.0, 999.0, 999.0
         else:
-            r2 = r2_score(actuals, predictions)
-            rmse = np.sqrt(mean_squared_error(actuals, predictions))
-            mae = np.mean(np.abs(np.array(actuals) - np.array(predictions)))
+            metrics = self._metrics(actuals, predictions)
+            r2, rmse, mae = metrics['r2_score'], metrics['rmse'], metrics['mae']
             print(f"Chain validation completed with {len(predictions)} successful predictions")
         
         results = {
@@ -750,20 +1189,27 @@ class CascadeModelManager:
             'mae': mae,
             'n_samples': len(predictions),  # Actual successful samples
             'n_requested': n_samples,  # Originally requested samples
-            'predictions': predictions,
-            'actuals': actuals
+            'predictions': predictions.tolist() if store_pointwise else [],
+            'actuals': actuals.tolist() if store_pointwise else [],
+            'cv_accuracy': cv_accuracy
         }
         
         print(f"Complete Chain Validation:")
         print(f"  R² Score: {r2:.4f}")
         print(f"  RMSE: {rmse:.2f}%")
         print(f"  MAE: {mae:.2f}%")
+        for cv_id, cv_metrics in cv_accuracy.items():
+            print(f"  {cv_id}: R² {cv_metrics['r2_score']:.4f}, RMSE {cv_metrics['rmse']:.4f}")
         
         return results
     
     
     def load_models(self) -> bool:
         """Load trained models from disk"""
+        if self.model_save_path is None:
+            print("Error loading models: in-memory manager has no model_save_path")
+            return False
+        
         try:
             # Load metadata first (critical for feature order)
             loaded_metadata = self.load_metadata()
@@ -791,24 +1237,38 @@ class CascadeModelManager:
                 print(f"⚠️ No metadata found at {self.model_save_path}")
             
             # Use configured CVs if available, otherwise fall back to classifier
-            cvs = self.configured_features['cvs'] or [cv.id for cv in self.classifier.get_cvs()]
+            cvs = self._feature_ids('cvs')
             
-            # Load process models
+            # Collect the model/scaler files to load: (model key, model path, scaler path)
+            to_load = []
             for cv_id in cvs:
                 model_path = os.path.join(self.model_save_path, f"process_model_{cv_id}.pkl")
                 scaler_path = os.path.join(self.model_save_path, f"scaler_mv_to_{cv_id}.pkl")
                 
                 if os.path.exists(model_path) and os.path.exists(scaler_path):
-                    self.process_models[cv_id] = joblib.load(model_path)
-                    self.scalers[f"mv_to_{cv_id}"] = joblib.load(scaler_path)
+                    to_load.append((cv_id, model_path, scaler_path))
             
-            # Load quality model
             quality_model_path = os.path.join(self.model_save_path, "quality_model.pkl")
             quality_scaler_path = os.path.join(self.model_save_path, "scaler_quality_model.pkl")
             
             if os.path.exists(quality_model_path) and os.path.exists(quality_scaler_path):
-                self.quality_model = joblib.load(quality_model_path)
-                self.scalers['quality_model'] = joblib.load(quality_scaler_path)
+                to_load.append((None, quality_model_path, quality_scaler_path))
+            
+            # Read and unpickle all files concurrently - file reads and the native
+            # model deserialization release the GIL
+            if to_load:
+                paths = [path for _, model_path, scaler_path in to_load for path in (model_path, scaler_path)]
+                with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+                    loaded = list(executor.map(_load_model_file, paths))
+                
+                for i, (cv_id, _, _) in enumerate(to_load):
+                    model, scaler = loaded[2 * i], loaded[2 * i + 1]
+                    if cv_id is None:
+                        self.quality_model = model
+                        self.scalers['quality_model'] = scaler
+                    else:
+                        self.process_models[cv_id] = model
+                        self.scalers[f"mv_to_{cv_id}"] = scaler
             
             print(f"Models loaded successfully from {self.model_save_path}")
             return True
@@ -818,18 +1278,45 @@ class CascadeModelManager:
             return False
     
     def _save_metadata(self):
-        """Save model metadata to JSON file"""
+        """
+        Save model metadata as metadata.json plus a binary metadata.pkl copy
+        
+        metadata.json stays the exchange format (mill listings, endpoints and
+        external tools read it); metadata.pkl (pickle protocol 5) is what
+        load_metadata() reads back, skipping JSON text parsing.
+        """
+        if self.model_save_path is None:
+            return
         metadata_path = os.path.join(self.model_save_path, "metadata.json")
-        with open(metadata_path, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+        _dump_json_file(self.metadata, metadata_path)
+        # Written after the JSON so load_metadata() sees it as current
+        with open(os.path.join(self.model_save_path, "metadata.pkl"), 'wb') as f:
+            pickle.dump(self.metadata, f, protocol=5)
         print(f"Metadata saved to: {metadata_path}")
     
     def load_metadata(self) -> Optional[Dict[str, Any]]:
-        """Load model metadata from JSON file"""
+        """
+        Load model metadata, preferring the binary metadata.pkl copy
+        
+        Falls back to metadata.json when there is no pickle, or when the JSON is
+        newer (models saved by older versions, or a hand-edited metadata.json).
+        """
+        if self.model_save_path is None:
+            return None
         metadata_path = os.path.join(self.model_save_path, "metadata.json")
-        if os.path.exists(metadata_path):
-            with open(metadata_path, 'r') as f:
-                return json.load(f)
+        pickle_path = os.path.join(self.model_save_path, "metadata.pkl")
+        try:
+            json_mtime = os.stat(metadata_path).st_mtime
+        except FileNotFoundError:
+            json_mtime = None
+        try:
+            if json_mtime is None or os.stat(pickle_path).st_mtime >= json_mtime:
+                with open(pickle_path, 'rb') as f:
+                    return pickle.load(f)
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+            pass
+        if json_mtime is not None:
+            return _load_json_file(metadata_path)
         return None
     
     def get_model_summary(self) -> Dict[str, Any]:
@@ -851,46 +1338,52 @@ class CascadeModelManager:
         """List all available mill models with their metadata"""
         mill_models = {}
         
-        if not os.path.exists(base_path):
+        try:
+            # scandir entries carry their file type, so no extra stat() per item
+            with os.scandir(base_path) as it:
+                mill_entries = [entry for entry in it
+                                if entry.name.startswith("mill_") and entry.is_dir()]
+        except FileNotFoundError:
             return mill_models
             
-        for item in os.listdir(base_path):
-            item_path = os.path.join(base_path, item)
-            if os.path.isdir(item_path) and item.startswith("mill_"):
-                # Strictly enforce mill_{number} format
-                parts = item.split("_")
-                if len(parts) != 2 or not parts[1].isdigit():
-                    continue
+        for entry in mill_entries:
+            item, item_path = entry.name, entry.path
+            # Strictly enforce mill_{number} format
+            parts = item.split("_")
+            if len(parts) != 2 or not parts[1].isdigit():
+                continue
+                
+            try:
+                mill_number = int(parts[1])
+                
+                # One directory listing gives both the metadata file and the model files
+                with os.scandir(item_path) as files:
+                    file_names = [f.name for f in files if f.is_file()]
+                
+                if "metadata.json" in file_names:
+                    metadata = _load_json_file(os.path.join(item_path, "metadata.json"))
+                    
+                    # Sanitize metadata to handle NaN/Infinity values
+                    sanitized_metadata = cls.sanitize_json_data(metadata)
                     
-                try:
-                    mill_number = int(parts[1])
-                    metadata_path = os.path.join(item_path, "metadata.json")
+                    # Check for model files
+                    model_files = [f for f in file_names if f.endswith('.pkl') and f != 'metadata.pkl']
                     
-                    if os.path.exists(metadata_path):
-                        with open(metadata_path, 'r') as f:
-                            metadata = json.load(f)
-                        
-                        # Sanitize metadata to handle NaN/Infinity values
-                        sanitized_metadata = cls.sanitize_json_data(metadata)
-                        
-                        # Check for model files
-                        model_files = [f for f in os.listdir(item_path) if f.endswith('.pkl')]
-                        
-                        mill_models[mill_number] = {
-                            "path": item_path,
-                            "metadata": sanitized_metadata,
-                            "model_files": model_files,
-                            "has_complete_cascade": len([f for f in model_files if f.startswith('process_model_')]) > 0 and 'quality_model.pkl' in model_files
-                        }
-                except (ValueError, json.JSONDecodeError) as e:
-                    print(f"Error processing mill folder {item}: {e}")
-                    # Include mills with failed metadata but with error information
                     mill_models[mill_number] = {
                         "path": item_path,
-                        "metadata": {"error": f"Failed to load metadata: {e}"},
-                        "model_files": [],
-                        "has_complete_cascade": False
+                        "metadata": sanitized_metadata,
+                        "model_files": model_files,
+                        "has_complete_cascade": len([f for f in model_files if f.startswith('process_model_')]) > 0 and 'quality_model.pkl' in model_files
                     }
-                    continue
-        
+            except (ValueError, json.JSONDecodeError) as e:
+                print(f"Error processing mill folder {item}: {e}")
+                # Include mills with failed metadata but with error information
+                mill_models[mill_number] = {
+                    "path": item_path,
+                    "metadata": {"error": f"Failed to load metadata: {e}"},
+                    "model_files": [],
+                    "has_complete_cascade": False
+                }
+                continue
+    
         return mill_models
@@ -54,6 +54,9 @@ class CascadeTrainingWithSteadyState:
         self.steady_state_data = None
         self.training_metadata = {}
         
+        # Per-regime views of steady_state_data, grouped lazily on first filter
+        self._regime_views: Dict[str, pd.DataFrame] = {}
+        
     def extract_steady_state_data(self,
                                   mill_number: int,
                                   start_date: str,
@@ -64,7 +67,8 @@ class CascadeTrainingWithSteadyState:
                                   residence_time_minutes: int = 60,
                                   n_motifs: int = 10,
                                   quality_threshold: float = 0.5,
-                                  min_occurrences: int = 3) -> pd.DataFrame:
+                                  min_occurrences: int = 3,
+                                  accelerator: str = 'auto') -> pd.DataFrame:
         """
         Extract steady-state data using complete pipeline
         
@@ -79,6 +83,7 @@ class CascadeTrainingWithSteadyState:
             n_motifs: Number of motifs to discover
             quality_threshold: Minimum quality score
             min_occurrences: Minimum pattern occurrences
+            accelerator: Matrix profile compute device ('auto', 'cpu' or 'gpu')
             
         Returns:
             DataFrame with steady-state data
@@ -104,7 +109,8 @@ class CascadeTrainingWithSteadyState:
         mp_results = self.mp_computer.compute_mp_with_auto_window(
             data=normalized_data,
             residence_time_minutes=residence_time_minutes,
-            sampling_freq_minutes=1
+            sampling_freq_minutes=1,
+            accelerator=accelerator
         )
         
         # Phase 3: Motif Discovery
@@ -139,6 +145,11 @@ class CascadeTrainingWithSteadyState:
             min_occurrences=min_occurrences
         )
         
+        # Categorical regime labels: few distinct values over many rows, so
+        # regime filtering compares integer codes instead of Python strings
+        if 'regime_label' in steady_state_df.columns:
+            steady_state_df['regime_label'] = steady_state_df['regime_label'].astype('category')
+        
         # Store metadata
         self.training_metadata = {
             'mill_number': mill_number,
@@ -156,9 +167,10 @@ class CascadeTrainingWithSteadyState:
         }
         
         self.steady_state_data = steady_state_df
+        self._regime_views = {}
         
         logger.info("\n✅ Steady-state extraction complete!")
-        logger.info(f"   Extracted {len(steady_state_df)} high-quality records")
+        logger.info("   Extracted %d high-quality records", len(steady_state_df))
         
         return steady_state_df
     
@@ -204,10 +216,10 @@ class CascadeTrainingWithSteadyState:
         all_features.append(target_variable)
         
         # Filter by regime if specified
-        df = self.steady_state_data.copy()
+        df = self.steady_state_data
         if regime_filter:
-            df = df[df['regime_label'].isin(regime_filter)]
-            logger.info(f"  Filtered to {len(df)} records from regimes: {regime_filter}")
+            df = self._get_regime_data(regime_filter)
+            logger.info("  Filtered to %d records from regimes: %s", len(df), regime_filter)
         
         # Check if all features exist
         missing_features = [f for f in all_features if f not in df.columns]
@@ -216,8 +228,8 @@ class CascadeTrainingWithSteadyState:
         
         training_data = df[all_features].copy()
         
-        logger.info(f"  Training data shape: {training_data.shape}")
-        logger.info(f"  Features: {all_features}")
+        logger.info("  Training data shape: %s", training_data.shape)
+        logger.info("  Features: %s", all_features)
         
         # Initialize cascade model manager
         logger.info("\n[Step 2/3] Initializing cascade model manager...")
@@ -248,7 +260,7 @@ class CascadeTrainingWithSteadyState:
         save_path = os.path.join(self.model_save_path, model_name)
         cascade_manager.save_models(save_path)
         
-        logger.info(f"\n✅ Models saved to: {save_path}")
+        logger.info("\n✅ Models saved to: %s", save_path)
         
         # Combine results with metadata
         results = {
@@ -264,6 +276,32 @@ class CascadeTrainingWithSteadyState:
         
         return results
     
+    def _get_regime_data(self, regime_filter: List[str]) -> pd.DataFrame:
+        """
+        Get steady-state records for the given regimes
+        
+        The data is grouped by regime once and cached, so repeated per-regime
+        training runs retrieve their rows without rescanning the full frame.
+        
+        Args:
+            regime_filter: Regime labels to include
+            
+        Returns:
+            DataFrame with records from the requested regimes, in original order
+        """
+        if not self._regime_views:
+            self._regime_views = {
+                regime: group
+                for regime, group in self.steady_state_data.groupby('regime_label', observed=True)
+            }
+        
+        frames = [self._regime_views[r] for r in dict.fromkeys(regime_filter) if r in self._regime_views]
+        if not frames:
+            return self.steady_state_data.iloc[0:0]
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames).sort_index()
+    
     def train_with_comparison(self,
                              mill_number: int,
                              start_date: str,
@@ -368,7 +406,7 @@ class CascadeTrainingWithSteadyState:
         
         logger.info("\n📊 Performance Comparison:")
         for metric, improvement in comparison['improvement'].items():
-            logger.info(f"  {metric}: {improvement:+.2%} improvement")
+            logger.info("  %s: %+.2f%% improvement", metric, improvement * 100)
         
         return comparison
     
@@ -5,15 +5,131 @@ Handles loading, prediction, and management of GPR cascade models.
 Compatible with XGBoost cascade structure but uses GPR models with uncertainty quantification.
 """
 
+import asyncio
 import numpy as np
-import pandas as pd
 import pickle
-from typing import Dict, List, Optional, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any, Tuple
+from scipy.linalg import solve_triangular
+from scipy.spatial.distance import cdist
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel, WhiteKernel, Product, Sum
 from sklearn.preprocessing import StandardScaler
 import os
 import json
+import logging
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+# Process-level registry of loaded managers, keyed by (base_path, mill_number).
+# Unpickling GPR models materializes their training-set kernel factors, so each
+# mill is loaded once and reused until its files change on disk; least recently
+# used mills are evicted.
+_MODEL_CACHE: "OrderedDict[Tuple[str, int], Tuple[Tuple[int, int], GPRCascadeModelManager]]" = OrderedDict()
+_MODEL_CACHE_LOCK = threading.Lock()
+_MODEL_CACHE_MAXSIZE = 8
+
+# Mill directory listings, keyed by path and invalidated when the directory mtime
+# changes. Callers get copies, so mutating a returned listing never alters the cache.
+_DIR_CACHE: Dict[str, Tuple[int, List[str]]] = {}
+
+
+def _read_metadata_json(metadata_path: str) -> Optional[Dict[str, Any]]:
+    """Parse a metadata.json (orjson when available); None if the file does not exist"""
+    try:
+        with open(metadata_path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity tokens, which only the stdlib parser accepts
+    return json.loads(raw)
+
+
+def _list_pkl_files_cached(dir_path: str) -> List[str]:
+    """List .pkl files in a directory, reusing the previous listing while its mtime is unchanged (returns a copy)"""
+    mtime_ns = os.stat(dir_path).st_mtime_ns
+    cached = _DIR_CACHE.get(dir_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return list(cached[1])
+    
+    with os.scandir(dir_path) as it:
+        model_files = [entry.name for entry in it if entry.name.endswith('.pkl') and entry.is_file()]
+    _DIR_CACHE[dir_path] = (mtime_ns, model_files)
+    return list(model_files)
+
+
+def _model_files_fingerprint(model_dir: str) -> Optional[Tuple[int, int]]:
+    """(metadata.json mtime, newest .pkl mtime) of a mill directory - changes when models are retrained"""
+    try:
+        metadata_mtime = os.stat(os.path.join(model_dir, "metadata.json")).st_mtime_ns
+        with os.scandir(model_dir) as it:
+            pkl_mtime = max((entry.stat().st_mtime_ns for entry in it
+                             if entry.name.endswith('.pkl') and entry.is_file()), default=0)
+    except FileNotFoundError:
+        return None
+    return metadata_mtime, pkl_mtime
+
+
+def _has_complete_cascade(model_files: List[str]) -> bool:
+    """Single pass over a mill's .pkl names: at least one process model and the quality model"""
+    has_process = has_quality = False
+    for f in model_files:
+        if f == 'quality_model.pkl':
+            has_quality = True
+        elif f.startswith('process_model_') and not f.endswith('_scaler.pkl'):
+            has_process = True
+        if has_process and has_quality:
+            return True
+    return False
+
+
+def _compile_packer(name: str, args: str, assignments: List[str]):
+    """
+    Build a function that writes dict values straight into fixed array positions
+    
+    Feature orders are fixed once a mill's metadata is loaded, so the per-call
+    loop over feature names is unrolled into constant-index assignments.
+    """
+    body = "\n".join(f"    {line}" for line in assignments) or "    pass"
+    namespace: Dict[str, Any] = {}
+    exec(f"def {name}({args}):\n{body}\n", namespace)
+    return namespace[name]
+
+
+def _rbf_kernel_terms(kernel) -> Optional[Tuple[float, np.ndarray, float]]:
+    """
+    Decompose RBF, C * RBF and (C *) RBF + White kernels
+    
+    Returns:
+        (signal variance, length scales, white noise level), or None for other kernels
+    """
+    # Exact type checks - Matern subclasses RBF
+    if type(kernel) is RBF:
+        return 1.0, np.asarray(kernel.length_scale, dtype=np.float64), 0.0
+    if type(kernel) is Product:
+        for const, rbf in ((kernel.k1, kernel.k2), (kernel.k2, kernel.k1)):
+            if type(const) is ConstantKernel and type(rbf) is RBF:
+                return float(const.constant_value), np.asarray(rbf.length_scale, dtype=np.float64), 0.0
+    if type(kernel) is Sum:
+        for base, white in ((kernel.k1, kernel.k2), (kernel.k2, kernel.k1)):
+            if type(white) is WhiteKernel:
+                terms = _rbf_kernel_terms(base)
+                if terms is not None:
+                    return terms[0], terms[1], terms[2] + float(white.noise_level)
+    return None
+
 
 class GPRCascadeModelManager:
     """
@@ -28,6 +144,8 @@ class GPRCascadeModelManager:
         self.process_models = {}  # MV → CV models (GPR)
         self.quality_model = None  # CV + DV → Target model (GPR)
         self.scalers = {}
+        self._shared_mv_scaler: Optional[StandardScaler] = None  # Set when all process scalers are identical
+        self._kernel_groups: List[Dict[str, Any]] = []  # Process GPs sharing kernel + training inputs
         
         # Set mill-specific model save path (mill_gp_XX format)
         if mill_number:
@@ -45,19 +163,124 @@ class GPRCascadeModelManager:
             "training_config": {},
             "model_performance": {}
         }
+        self._resolve_feature_orders()
+    
+    def _resolve_feature_orders(self):
+        """
+        Fix the MV/CV/quality-feature column orders from metadata once
+        
+        Prediction then packs inputs straight into numpy rows in this order,
+        with no per-call metadata lookups or DataFrame construction.
+        """
+        features = self.metadata.get("features", {})
+        cvs = features.get("cv_features", [])
+        dvs = features.get("dv_features", [])
+        quality_model_info = self.metadata.get("model_performance", {}).get("quality_model", {})
+        
+        self._mv_order = tuple(features.get("mv_features", []))
+        self._cv_order = tuple(cvs)
+        self._dv_order = tuple(dvs)
+        self._quality_order = tuple(quality_model_info.get("input_features", cvs + dvs))
+        
+        # Specialized packers for the resolved orders; feature names are embedded via repr()
+        self._pack_mv = _compile_packer(
+            "_pack_mv", "d, out",
+            [f"out[0, {j}] = d[{mv_id!r}]" for j, mv_id in enumerate(self._mv_order)]
+        )
+        # DV inputs take precedence over predicted CVs; a feature in neither raises KeyError
+        self._pack_quality = _compile_packer(
+            "_pack_quality", "cvs, dvs, out",
+            [f"out[0, {j}] = dvs[{col!r}] if {col!r} in dvs else cvs[{col!r}]"
+             for j, col in enumerate(self._quality_order)]
+        )
+        # Same, reading predicted CVs from a vector in _cv_order (predict_cascade_fast)
+        cv_index = {cv_id: k for k, cv_id in enumerate(self._cv_order)}
+        self._pack_quality_vec = _compile_packer(
+            "_pack_quality_vec", "cv_vec, dvs, out",
+            [f"out[0, {j}] = dvs[{col!r}] if {col!r} in dvs else cv_vec[{cv_index[col]}]" if col in cv_index
+             else f"out[0, {j}] = dvs[{col!r}]"
+             for j, col in enumerate(self._quality_order)]
+        )
+    
+    @property
+    def mv_order(self) -> Tuple[str, ...]:
+        """MV column order expected by predict_cascade_batch (from metadata)"""
+        return self._mv_order
+    
+    @property
+    def cv_names(self) -> Tuple[str, ...]:
+        """CV order of the vector returned by predict_cascade_fast (from metadata)"""
+        return self._cv_order
+    
+    @classmethod
+    def get_or_load(cls, base_path: str, mill_number: int) -> Optional["GPRCascadeModelManager"]:
+        """
+        Return a loaded manager for the mill, loading it from disk on first use
+        and again whenever the mill's model files have changed (retraining)
+        
+        The registry lock only guards the lookup and the insert; the (slow) unpickling
+        runs outside it, so loading one mill never blocks lookups of the others.
+        Blocking - call it from a worker thread in async code.
+        
+        Args:
+            base_path: Base directory containing mill_gp_XX folders
+            mill_number: Mill number
+            
+        Returns:
+            Loaded manager, or None if the models could not be loaded
+        """
+        key = (os.path.abspath(base_path), mill_number)
+        # Taken before loading: files rewritten during the load leave a stale fingerprint,
+        # so the next call reloads rather than keeping a half-old manager
+        fingerprint = _model_files_fingerprint(os.path.join(base_path, f"mill_gp_{mill_number:02d}"))
+        if fingerprint is None:
+            return None
+        with _MODEL_CACHE_LOCK:
+            cached = _MODEL_CACHE.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                _MODEL_CACHE.move_to_end(key)
+                return cached[1]
+        
+        manager = cls(base_path, mill_number=mill_number)
+        if not manager.load_models():
+            return None
+        
+        with _MODEL_CACHE_LOCK:
+            _MODEL_CACHE[key] = (fingerprint, manager)
+            _MODEL_CACHE.move_to_end(key)
+            while len(_MODEL_CACHE) > _MODEL_CACHE_MAXSIZE:
+                _MODEL_CACHE.popitem(last=False)
+        return manager
+    
+    @classmethod
+    def invalidate(cls, mill_number: Optional[int] = None, base_path: Optional[str] = None):
+        """
+        Drop cached managers (e.g. after retraining) so the next get_or_load() reloads from disk
+        
+        Args:
+            mill_number: Mill to invalidate; None invalidates all mills
+            base_path: Restrict invalidation to this base directory
+        """
+        base_path = os.path.abspath(base_path) if base_path else None
+        with _MODEL_CACHE_LOCK:
+            for key in list(_MODEL_CACHE):
+                if (mill_number is None or key[1] == mill_number) and (base_path is None or key[0] == base_path):
+                    del _MODEL_CACHE[key]
     
     def load_models(self) -> bool:
         """Load trained GPR models from disk"""
         try:
-            print(f"🔍 Loading GPR models from {self.model_save_path}")
+            logger.debug("🔍 Loading GPR models from %s", self.model_save_path)
             
-            # Load metadata first (critical for feature order)
-            loaded_metadata = self.load_metadata()
+            # Load metadata first (critical for feature order); read from disk, since a
+            # reload may follow retraining
+            loaded_metadata = _read_metadata_json(os.path.join(self.model_save_path, "metadata.json"))
             if loaded_metadata:
                 self.metadata = loaded_metadata
-                print(f"✅ Metadata loaded from {self.model_save_path}")
+                self._resolve_feature_orders()
+                logger.debug("✅ Metadata loaded from %s", self.model_save_path)
             else:
-                print(f"⚠️ No metadata found at {self.model_save_path}")
+                logger.warning("⚠️ No metadata found at %s", self.model_save_path)
                 return False
             
             # Get CV features from metadata
@@ -65,48 +288,210 @@ class GPRCascadeModelManager:
             cvs = features.get("cv_features", [])
             
             if not cvs:
-                print(f"❌ No CV features found in metadata")
+                logger.error("❌ No CV features found in metadata")
                 return False
             
-            # Load process models (MV → CV)
+            # Unpickle process models (MV → CV) and the quality model (CV + DV → Target)
+            # concurrently; each model/scaler pair is an independent file read.
+            def _load_one(name: str, prefix: str):
+                model_path = os.path.join(self.model_save_path, f"{prefix}.pkl")
+                scaler_path = os.path.join(self.model_save_path, f"{prefix}_scaler.pkl")
+                if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+                    return name, None, None
+                with open(model_path, 'rb') as f:
+                    model = pickle.load(f)
+                with open(scaler_path, 'rb') as f:
+                    scaler = pickle.load(f)
+                # Scalers fitted on DataFrames warn on every ndarray transform; inputs
+                # are packed in the metadata feature order, so drop the stored names
+                if hasattr(scaler, 'feature_names_in_'):
+                    del scaler.feature_names_in_
+                return name, model, scaler
+            
+            tasks = [(cv_id, f"process_model_{cv_id}") for cv_id in cvs]
+            tasks.append((None, "quality_model"))
+            loaded = {}
+            with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as executor:
+                futures = [executor.submit(_load_one, name, prefix) for name, prefix in tasks]
+                for future in as_completed(futures):
+                    name, model, scaler = future.result()
+                    loaded[name] = (model, scaler)
+            
+            # Assign in metadata order so process_models keeps the configured CV order
             for cv_id in cvs:
-                model_path = os.path.join(self.model_save_path, f"process_model_{cv_id}.pkl")
-                scaler_path = os.path.join(self.model_save_path, f"process_model_{cv_id}_scaler.pkl")
-                
-                if os.path.exists(model_path) and os.path.exists(scaler_path):
-                    with open(model_path, 'rb') as f:
-                        self.process_models[cv_id] = pickle.load(f)
-                    with open(scaler_path, 'rb') as f:
-                        self.scalers[f"process_model_{cv_id}"] = pickle.load(f)
-                    print(f"  ✅ Loaded process model: {cv_id}")
+                model, scaler = loaded[cv_id]
+                if model is not None:
+                    self.process_models[cv_id] = model
+                    self.scalers[f"process_model_{cv_id}"] = scaler
+                    logger.debug("  ✅ Loaded process model: %s", cv_id)
                 else:
-                    print(f"  ⚠️ Missing files for process model: {cv_id}")
+                    logger.warning("  ⚠️ Missing files for process model: %s", cv_id)
             
-            # Load quality model (CV + DV → Target)
-            quality_model_path = os.path.join(self.model_save_path, "quality_model.pkl")
-            quality_scaler_path = os.path.join(self.model_save_path, "quality_model_scaler.pkl")
-            
-            if os.path.exists(quality_model_path) and os.path.exists(quality_scaler_path):
-                with open(quality_model_path, 'rb') as f:
-                    self.quality_model = pickle.load(f)
-                with open(quality_scaler_path, 'rb') as f:
-                    self.scalers['quality_model'] = pickle.load(f)
-                print(f"  ✅ Loaded quality model")
+            quality_model, quality_scaler = loaded[None]
+            if quality_model is not None:
+                self.quality_model = quality_model
+                self.scalers['quality_model'] = quality_scaler
+                logger.debug("  ✅ Loaded quality model")
             else:
-                print(f"  ⚠️ Missing quality model files")
+                logger.warning("  ⚠️ Missing quality model files")
                 return False
             
-            print(f"✅ GPR models loaded successfully from {self.model_save_path}")
-            print(f"   Process models: {len(self.process_models)}")
-            print(f"   Quality model: {'Yes' if self.quality_model else 'No'}")
+            self._shared_mv_scaler = self._detect_shared_mv_scaler()
+            self._kernel_groups = self._build_kernel_groups()
+            
+            logger.info("✅ GPR models loaded successfully from %s (process models: %d, quality model: %s)",
+                        self.model_save_path, len(self.process_models), 'Yes' if self.quality_model else 'No')
             return True
             
         except Exception as e:
-            print(f"❌ Error loading GPR models: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error loading GPR models: %s", e)
             return False
     
+    def _detect_shared_mv_scaler(self) -> Optional[StandardScaler]:
+        """
+        Return the common MV scaler if every process model uses identical scaling
+        
+        All process models take the same MV inputs, so their scalers are normally
+        fitted to the same data; the MV vector can then be standardized once per
+        prediction instead of once per CV.
+        """
+        mv_scalers = [self.scalers[f"process_model_{cv_id}"] for cv_id in self.process_models]
+        if not mv_scalers:
+            return None
+        
+        first = mv_scalers[0]
+        for scaler in mv_scalers[1:]:
+            if not (np.array_equal(scaler.mean_, first.mean_) and np.array_equal(scaler.scale_, first.scale_)):
+                return None
+        return first
+    
+    def _build_kernel_groups(self) -> List[Dict[str, Any]]:
+        """
+        Group process GPs whose posterior means can be computed with a single GEMM
+        
+        Models with an equal fitted kernel and identical training inputs (and a
+        shared scaler) share K_star = k(X, X_train); stacking their alpha_ vectors
+        into an (n_train, K) matrix yields all K means from one matmul. RBF-type
+        kernels are also evaluated directly with cdist (see _group_cross_cov), so
+        such models get a group even when they share nothing.
+        """
+        if self._shared_mv_scaler is None:
+            return []
+        
+        def stackable(gp) -> bool:
+            return hasattr(gp, 'alpha_') and np.ndim(gp.alpha_) == 1
+        
+        groups = []
+        remaining = [cv_id for cv_id in self._cv_order
+                     if cv_id in self.process_models and stackable(self.process_models[cv_id])]
+        while remaining:
+            lead_id = remaining.pop(0)
+            lead = self.process_models[lead_id]
+            members = [cv_id for cv_id in remaining
+                       if self.process_models[cv_id].kernel_ == lead.kernel_
+                       and np.array_equal(self.process_models[cv_id].X_train_, lead.X_train_)]
+            rbf_terms = _rbf_kernel_terms(lead.kernel_)
+            # Single models are worth a group only for the direct RBF evaluation
+            if not members and rbf_terms is None:
+                continue
+            remaining = [cv_id for cv_id in remaining if cv_id not in members]
+            cv_ids = [lead_id] + members
+            gps = [self.process_models[cv_id] for cv_id in cv_ids]
+            if rbf_terms is not None:
+                signal_var, length_scale, noise = rbf_terms
+                rbf = {
+                    'signal_var': signal_var,
+                    'inv_length_scale': 1.0 / length_scale,
+                    'X_train_scaled': np.asarray(lead.X_train_, dtype=np.float64) / length_scale,
+                    'diag': signal_var + noise
+                }
+            else:
+                rbf = None
+            groups.append({
+                'cv_ids': cv_ids,
+                'kernel': lead.kernel_,
+                'X_train': lead.X_train_,
+                'rbf': rbf,
+                'alpha': np.column_stack([gp.alpha_ for gp in gps]),
+                # Shared Cholesky factor (same kernel, inputs and noise) -> one solve for all stds
+                'L': lead.L_ if all(np.array_equal(gp.L_, lead.L_) for gp in gps[1:]) else None,
+                # normalize_y de-standardization (identity when normalize_y=False)
+                'y_std': np.array([float(np.ravel(getattr(gp, '_y_train_std', 1.0))[0]) for gp in gps]),
+                'y_mean': np.array([float(np.ravel(getattr(gp, '_y_train_mean', 0.0))[0]) for gp in gps])
+            })
+        return groups
+    
+    @staticmethod
+    def _group_cross_cov(group: Dict[str, Any], X: np.ndarray) -> np.ndarray:
+        """
+        Cross-covariance k(X, X_train) for a kernel group
+        
+        RBF-type kernels are computed as sigma_f^2 * exp(-0.5 * ||(x - x') / l||^2)
+        from one cdist call against the pre-scaled training inputs, skipping the
+        composite kernel's per-term arrays (constant fill, zero white-noise block).
+        """
+        rbf = group['rbf']
+        if rbf is None:
+            return group['kernel'](X, group['X_train'])
+        dists = cdist(np.asarray(X, dtype=np.float64) * rbf['inv_length_scale'], rbf['X_train_scaled'], 'sqeuclidean')
+        K_star = np.exp(-0.5 * dists, out=dists)
+        if rbf['signal_var'] != 1.0:
+            K_star *= rbf['signal_var']
+        return K_star
+    
+    def _predict_cvs(self, mv_input: np.ndarray, return_uncertainty: bool) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Predict all CVs for an (n_samples, n_mvs) MV matrix
+        
+        Returns:
+            Tuple of (predicted CV arrays, CV std arrays - empty unless return_uncertainty)
+        """
+        predicted_cvs = {}
+        cv_uncertainties = {}
+        
+        # Standardize once when all process models share the same scaler
+        shared_scaled = self._shared_mv_scaler.transform(mv_input) if self._shared_mv_scaler is not None else None
+        
+        # Stacked GEMM for models that share kernel and training inputs; with
+        # uncertainty, groups sharing the Cholesky factor L_ also share one
+        # triangular solve: var = k(x, x) - ||L^-1 k(X_train, x)||^2
+        for group in self._kernel_groups:
+            if return_uncertainty and group['L'] is None:
+                continue
+            K_star = self._group_cross_cov(group, shared_scaled)
+            means = K_star @ group['alpha'] * group['y_std'] + group['y_mean']
+            if return_uncertainty:
+                V = solve_triangular(group['L'], K_star.T, lower=True, check_finite=False)
+                if group['rbf'] is not None:
+                    prior_var = group['rbf']['diag']
+                else:
+                    prior_var = group['kernel'].diag(shared_scaled)
+                var = prior_var - np.einsum('ij,ij->j', V, V)
+                std = np.sqrt(np.maximum(var, 0.0))
+            for j, cv_id in enumerate(group['cv_ids']):
+                predicted_cvs[cv_id] = means[:, j]
+                if return_uncertainty:
+                    cv_uncertainties[cv_id] = std * group['y_std'][j]
+        
+        for cv_id in self._cv_order:
+            if cv_id not in self.process_models or cv_id in predicted_cvs:
+                continue
+            if shared_scaled is not None:
+                mv_scaled = shared_scaled
+            else:
+                mv_scaled = self.scalers[f"process_model_{cv_id}"].transform(mv_input)
+            
+            # The std branch (triangular solve against L_) only when requested
+            gp_model = self.process_models[cv_id]
+            if return_uncertainty:
+                predicted_cvs[cv_id], cv_uncertainties[cv_id] = gp_model.predict(mv_scaled, return_std=True)
+            else:
+                predicted_cvs[cv_id] = gp_model.predict(mv_scaled)
+        
+        # Keep the metadata CV order in the returned dicts
+        predicted_cvs = {cv_id: predicted_cvs[cv_id] for cv_id in self._cv_order if cv_id in predicted_cvs}
+        return predicted_cvs, cv_uncertainties
+    
     def predict_cascade(
         self, 
         mv_values: Dict[str, float], 
@@ -127,98 +512,62 @@ class GPRCascadeModelManager:
         if not self.process_models or not self.quality_model:
             raise ValueError("GPR models not loaded. Call load_models() first.")
         
-        # Get features from metadata
-        features = self.metadata.get("features", {})
-        mvs = features.get("mv_features", [])
-        cvs = features.get("cv_features", [])
-        dvs = features.get("dv_features", [])
+        # Feature orders resolved from metadata at load time
+        mvs = self._mv_order
         
         # Step 1: Predict CVs from MVs using process models
+        mv_row = np.empty((1, len(mvs)), dtype=np.float64)
         try:
-            mv_df = pd.DataFrame([[mv_values[mv_id] for mv_id in mvs]], columns=mvs)
+            self._pack_mv(mv_values, mv_row)
         except KeyError as e:
-            print(f"❌ Prediction error: {e}")
-            print(f"   Available MV keys in request: {list(mv_values.keys())}")
-            print(f"   Required MV keys from model: {mvs}")
+            logger.error("❌ Prediction error: missing MV %s (available: %s, required: %s)",
+                         e, list(mv_values), mvs)
             raise
         
-        predicted_cvs = {}
-        cv_uncertainties = {}
-        
-        for cv_id in cvs:
-            if cv_id in self.process_models:
-                # Scale input - convert to numpy to avoid feature name warnings
-                scaler = self.scalers[f"process_model_{cv_id}"]
-                mv_scaled = scaler.transform(mv_df.values)
-                
-                # Predict with uncertainty
-                gp_model = self.process_models[cv_id]
-                cv_pred, cv_std = gp_model.predict(mv_scaled, return_std=True)
-                
-                predicted_cvs[cv_id] = float(cv_pred[0])
-                cv_uncertainties[cv_id] = float(cv_std[0])
+        cv_preds, cv_stds = self._predict_cvs(mv_row, return_uncertainty)
+        predicted_cvs = {cv_id: float(values[0]) for cv_id, values in cv_preds.items()}
+        cv_uncertainties = {cv_id: float(values[0]) for cv_id, values in cv_stds.items()}
         
         # Step 2: Check CV constraints (feasibility) - not implemented yet, assume feasible
         is_feasible = True
         constraint_violations = []
         
         # Step 3: Predict target quality
-        # Get the exact feature order from metadata
-        model_performance = self.metadata.get("model_performance", {})
-        quality_model_info = model_performance.get("quality_model", {})
-        feature_cols = quality_model_info.get("input_features", cvs + dvs)
-        
-        # Build feature dictionary
-        feature_dict = {}
-        feature_dict.update(predicted_cvs)
-        feature_dict.update(dv_values)
-        
-        # Create DataFrame with features in the exact order from training
-        # Use fallback values for any missing features
-        quality_features = []
-        missing_features = []
-        
-        for col in feature_cols:
-            if col in feature_dict:
-                quality_features.append(feature_dict[col])
-            else:
-                # Feature is missing - use a fallback value
-                missing_features.append(col)
-                
-                # Try to get default value from classifier or use midpoint of bounds
-                fallback_value = None
-                
-                # Check if it's a DV and get its default from classifier
-                if col in [dv.id for dv in self.classifier.get_dvs()]:
-                    dv_param = next((dv for dv in self.classifier.get_dvs() if dv.id == col), None)
-                    if dv_param and hasattr(dv_param, 'initialBounds'):
-                        min_val, max_val = dv_param.initialBounds
-                        fallback_value = (min_val + max_val) / 2
-                        print(f"⚠️ GPR: Missing DV '{col}' - using midpoint fallback: {fallback_value:.2f}")
-                
-                # If still no fallback, use 0
-                if fallback_value is None:
-                    fallback_value = 0.0
-                    print(f"⚠️ GPR: Missing feature '{col}' - using zero fallback")
-                
-                quality_features.append(fallback_value)
-        
-        if missing_features:
-            print(f"⚠️ GPR: Quality model prediction with missing features: {missing_features}")
-            print(f"   Required features: {feature_cols}")
-            print(f"   Provided CVs: {list(predicted_cvs.keys())}")
-            print(f"   Provided DVs: {list(dv_values.keys())}")
-            print(f"   Using fallback values for missing features")
+        # Exact feature order from metadata (as used during training)
+        feature_cols = self._quality_order
         
-        quality_df = pd.DataFrame([quality_features], columns=feature_cols)
+        # Pack features in the exact order from training
+        quality_row = np.empty((1, len(feature_cols)), dtype=np.float64)
+        try:
+            self._pack_quality(predicted_cvs, dv_values, quality_row)
+        except KeyError:
+            # Use fallback values for any missing features
+            feature_dict = {}
+            feature_dict.update(predicted_cvs)
+            feature_dict.update(dv_values)
+            missing_features = []
+            
+            for j, col in enumerate(feature_cols):
+                if col in feature_dict:
+                    quality_row[0, j] = feature_dict[col]
+                else:
+                    # Feature is missing - use a fallback value
+                    missing_features.append(col)
+                    quality_row[0, j] = self._fallback_feature_value(col)
+            
+            logger.debug("⚠️ GPR: Quality model prediction with missing features %s "
+                         "(required: %s, provided CVs: %s, provided DVs: %s) - using fallback values",
+                         missing_features, feature_cols, list(predicted_cvs), list(dv_values))
         
-        # Scale and predict with uncertainty - convert to numpy to avoid feature name warnings
-        quality_scaler = self.scalers['quality_model']
-        quality_scaled = quality_scaler.transform(quality_df.values)
+        # Scale and predict (with uncertainty only when requested)
+        quality_scaled = self.scalers['quality_model'].transform(quality_row)
         
-        target_pred, target_std = self.quality_model.predict(quality_scaled, return_std=True)
+        if return_uncertainty:
+            target_pred, target_std = self.quality_model.predict(quality_scaled, return_std=True)
+            target_uncertainty = float(target_std[0])
+        else:
+            target_pred = self.quality_model.predict(quality_scaled)
         predicted_target = float(target_pred[0])
-        target_uncertainty = float(target_std[0])
         
         # Build result
         result = {
@@ -237,17 +586,137 @@ class GPRCascadeModelManager:
         
         return result
     
+    def predict_cascade_fast(
+        self,
+        mv_values: Dict[str, float],
+        dv_values: Dict[str, float],
+        return_uncertainty: bool = False
+    ) -> Tuple[float, Optional[float], np.ndarray]:
+        """
+        Single-sample cascade prediction without the result dicts, for optimizer loops
+        
+        Args:
+            mv_values: Dictionary of manipulated variable values
+            dv_values: Dictionary of disturbance variable values
+            return_uncertainty: If True, also compute the target std
+            
+        Returns:
+            Tuple of (predicted target, target std or None, predicted CVs in cv_names
+            order - NaN for CVs without a loaded process model)
+        """
+        if not self.process_models or not self.quality_model:
+            raise ValueError("GPR models not loaded. Call load_models() first.")
+        
+        mv_row = np.empty((1, len(self._mv_order)), dtype=np.float64)
+        self._pack_mv(mv_values, mv_row)
+        cv_preds, _ = self._predict_cvs(mv_row, False)
+        cv_vec = np.array([cv_preds[cv_id][0] for cv_id in self._cv_order if cv_id in cv_preds], dtype=np.float64)
+        
+        quality_row = np.empty((1, len(self._quality_order)), dtype=np.float64)
+        try:
+            if len(cv_vec) != len(self._cv_order):
+                raise KeyError("missing process model")
+            self._pack_quality_vec(cv_vec, dv_values, quality_row)
+        except KeyError:
+            # Missing inputs need the fallback handling of the dict path
+            result = self.predict_cascade(mv_values, dv_values, return_uncertainty)
+            cv_vec = np.array([result['predicted_cvs'].get(cv_id, np.nan) for cv_id in self._cv_order], dtype=np.float64)
+            return result['predicted_target'], result.get('target_uncertainty'), cv_vec
+        
+        quality_scaled = self.scalers['quality_model'].transform(quality_row)
+        if return_uncertainty:
+            target_pred, target_std = self.quality_model.predict(quality_scaled, return_std=True)
+            return float(target_pred[0]), float(target_std[0]), cv_vec
+        return float(self.quality_model.predict(quality_scaled)[0]), None, cv_vec
+    
+    @staticmethod
+    def _fallback_feature_value(col: str) -> float:
+        """
+        Fallback value for a quality-model feature missing from the inputs
+        
+        GPR metadata carries no DV bounds to take a midpoint from, so missing
+        features fall back to zero.
+        """
+        logger.warning("⚠️ GPR: Missing feature '%s' - using zero fallback", col)
+        return 0.0
+    
+    def predict_cascade_batch(
+        self,
+        mv_matrix: np.ndarray,
+        dv_values: Optional[Dict[str, Any]] = None,
+        return_uncertainty: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Batched cascade prediction: MVs → CVs → Target for many samples at once
+        
+        Runs one GP predict per process model and one for the quality model over
+        the whole (n_samples, n_mvs) matrix instead of one call per sample.
+        
+        Args:
+            mv_matrix: Array of shape (n_samples, n_mvs), columns in metadata MV order
+            dv_values: DV values, each a scalar shared by all samples or an
+                       array of length n_samples
+            return_uncertainty: If True, also compute GP standard deviations
+            
+        Returns:
+            Dictionary with per-sample arrays of predicted CVs, target, feasibility
+            and optionally uncertainties
+        """
+        if not self.process_models or not self.quality_model:
+            raise ValueError("GPR models not loaded. Call load_models() first.")
+        
+        mvs = self._mv_order
+        dv_values = dv_values or {}
+        
+        mv_matrix = np.asarray(mv_matrix, dtype=np.float64)
+        if mv_matrix.ndim != 2 or mv_matrix.shape[1] != len(mvs):
+            raise ValueError(f"Expected MV matrix of shape (n_samples, {len(mvs)}) in order {mvs}, got {mv_matrix.shape}")
+        n_samples = mv_matrix.shape[0]
+        
+        # Step 1: Predict CVs from MVs - one GP call per process model
+        predicted_cvs, cv_uncertainties = self._predict_cvs(mv_matrix, return_uncertainty)
+        
+        # Step 2: Check CV constraints (feasibility) - not implemented yet, assume feasible
+        is_feasible = np.ones(n_samples, dtype=bool)
+        
+        # Step 3: Predict target quality over the assembled (n_samples, n_features) matrix
+        feature_cols = self._quality_order
+        
+        quality_matrix = np.empty((n_samples, len(feature_cols)), dtype=np.float64)
+        for j, col in enumerate(feature_cols):
+            # DV inputs take precedence over predicted CVs, as in predict_cascade
+            if col in dv_values:
+                quality_matrix[:, j] = dv_values[col]
+            elif col in predicted_cvs:
+                quality_matrix[:, j] = predicted_cvs[col]
+            else:
+                quality_matrix[:, j] = self._fallback_feature_value(col)
+        
+        quality_scaled = self.scalers['quality_model'].transform(quality_matrix)
+        result = {
+            'predicted_cvs': predicted_cvs,
+            'is_feasible': is_feasible
+        }
+        if return_uncertainty:
+            result['predicted_target'], result['target_uncertainty'] = self.quality_model.predict(
+                quality_scaled, return_std=True
+            )
+            result['cv_uncertainties'] = cv_uncertainties
+        else:
+            result['predicted_target'] = self.quality_model.predict(quality_scaled)
+        
+        return result
+    
     def load_metadata(self) -> Optional[Dict[str, Any]]:
-        """Load model metadata from JSON file"""
+        """Load model metadata from JSON file, reusing the metadata already loaded by load_models"""
+        if self.metadata.get("features"):
+            return self.metadata
         metadata_path = os.path.join(self.model_save_path, "metadata.json")
-        if os.path.exists(metadata_path):
-            with open(metadata_path, 'r') as f:
-                return json.load(f)
-        return None
+        return _read_metadata_json(metadata_path)
     
     def get_model_summary(self) -> Dict[str, Any]:
         """Get summary of trained GPR models"""
-        metadata = self.load_metadata()
+        metadata = self.metadata
         summary = {
             'mill_number': self.mill_number,
             'model_type': 'Gaussian Process Regression',
@@ -267,35 +736,207 @@ class GPRCascadeModelManager:
         
         if not os.path.exists(base_path):
             return mill_models
+        
+        for item, item_path in cls._scan_mill_dirs(base_path):
+            entry = cls._read_mill_dir(item, item_path)
+            if entry is not None:
+                mill_models[entry[0]] = entry[1]
+        
+        return mill_models
+    
+    @classmethod
+    async def list_mill_models_async(cls, base_path: str = "cascade_models") -> Dict[int, Dict[str, Any]]:
+        """
+        List all available GPR mill models, reading the mill directories concurrently
+        
+        Same result as list_mill_models, but each mill's metadata read and directory
+        scan runs in the default executor, so the event loop is not blocked and the
+        per-mill I/O overlaps.
+        """
+        if not os.path.exists(base_path):
+            return {}
+        
+        loop = asyncio.get_running_loop()
+        mill_dirs = await loop.run_in_executor(None, cls._scan_mill_dirs, base_path)
+        entries = await asyncio.gather(*[
+            loop.run_in_executor(None, cls._read_mill_dir, item, item_path)
+            for item, item_path in mill_dirs
+        ])
+        return {entry[0]: entry[1] for entry in entries if entry is not None}
+    
+    @staticmethod
+    def _scan_mill_dirs(base_path: str) -> List[Tuple[str, str]]:
+        """(name, path) of the mill_gp_XX directories under base_path"""
+        # Single scandir pass - DirEntry caches the file type, no per-entry isdir() stat
+        with os.scandir(base_path) as it:
+            return [(entry.name, entry.path) for entry in it
+                    if entry.name.startswith("mill_gp_") and entry.is_dir()]
+    
+    @staticmethod
+    def _read_mill_dir(item: str, item_path: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Read one mill_gp_XX directory; None if it has no metadata or cannot be parsed"""
+        try:
+            # Extract mill number from mill_gp_08 format
+            mill_number = int(item.split("_")[2])
+            metadata = _read_metadata_json(os.path.join(item_path, "metadata.json"))
+            
+            if metadata is None:
+                return None
+            
+            # Check for model files
+            model_files = _list_pkl_files_cached(item_path)
             
-        for item in os.listdir(base_path):
-            item_path = os.path.join(base_path, item)
-            # Look for mill_gp_XX directories
-            if os.path.isdir(item_path) and item.startswith("mill_gp_"):
+            return mill_number, {
+                "path": item_path,
+                "metadata": metadata,
+                "model_files": model_files,
+                "model_type": "gpr",
+                "has_complete_cascade": _has_complete_cascade(model_files)
+            }
+        except (ValueError, json.JSONDecodeError) as e:
+            logger.warning("Error processing GPR mill folder %s: %s", item, e)
+            return None
+
+
+class GPRPredictionBatcher:
+    """
+    Coalesces concurrent single-sample GPR cascade predictions into batches
+    
+    GP prediction cost is dominated by kernel matmuls against the training set,
+    which BLAS handles far better as one (B, n_features) call than as B one-row
+    calls. Requests arriving within max_queue_time of each other (up to
+    max_batch_size) are stacked and sent through predict_cascade_batch() once,
+    off the event loop.
+    """
+    
+    def __init__(self, model_manager: GPRCascadeModelManager,
+                 max_batch_size: int = 64, max_queue_time: float = 0.005):
+        self.model_manager = model_manager
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def predict(
+        self,
+        mv_values: Dict[str, float],
+        dv_values: Dict[str, float],
+        return_uncertainty: bool = False
+    ) -> Dict[str, Any]:
+        """Queue one prediction; returns the same structure as predict_cascade()"""
+        mvs = self.model_manager._mv_order
+        missing = [mv_id for mv_id in mvs if mv_id not in mv_values]
+        if missing:
+            raise KeyError(f"Missing MV values: {missing}")
+        
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        await self._queue.put((mv_values, dv_values, return_uncertainty, future))
+        return await future
+    
+    async def _run(self):
+        """Collect queued requests into batches and resolve their futures"""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_queue_time
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                
                 try:
-                    # Extract mill number from mill_gp_08 format
-                    mill_number = int(item.split("_")[2])
-                    metadata_path = os.path.join(item_path, "metadata.json")
-                    
-                    if os.path.exists(metadata_path):
-                        with open(metadata_path, 'r') as f:
-                            metadata = json.load(f)
-                        
-                        # Check for model files
-                        model_files = [f for f in os.listdir(item_path) if f.endswith('.pkl')]
-                        
-                        mill_models[mill_number] = {
-                            "path": item_path,
-                            "metadata": metadata,
-                            "model_files": model_files,
-                            "model_type": "gpr",
-                            "has_complete_cascade": (
-                                len([f for f in model_files if f.startswith('process_model_') and not f.endswith('_scaler.pkl')]) > 0 
-                                and 'quality_model.pkl' in model_files
-                            )
-                        }
-                except (ValueError, json.JSONDecodeError) as e:
-                    print(f"Error processing GPR mill folder {item}: {e}")
+                    results = await loop.run_in_executor(None, self._process_batch, batch)
+                except Exception:
+                    # One bad request must not fail the others stacked with it:
+                    # rerun each on its own and fail only those that still raise
+                    await self._resolve_individually(batch)
                     continue
+                
+                for (*_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        except asyncio.CancelledError:
+            # Don't leave callers of the batch in flight waiting forever
+            for *_, future in batch:
+                if not future.done():
+                    future.cancel()
+            raise
+    
+    async def _resolve_individually(self, batch: List[Tuple]):
+        """Resolve each request of a failed batch with its own predict_cascade() call"""
+        loop = asyncio.get_running_loop()
+        for mv_values, dv_values, return_uncertainty, future in batch:
+            if future.done():
+                continue
+            try:
+                result = await loop.run_in_executor(
+                    None, self.model_manager.predict_cascade, mv_values, dv_values, return_uncertainty
+                )
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(result)
+    
+    def close(self):
+        """
+        Stop the batching task (e.g. when the model manager is replaced)
         
-        return mill_models
+        Requests still waiting in the queue are cancelled; a batch already being
+        predicted is cancelled with the task.
+        """
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        if self._queue is not None:
+            while not self._queue.empty():
+                *_, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+        self._worker = None
+        self._queue = None
+    
+    def _process_batch(self, batch: List[Tuple]) -> List[Dict[str, Any]]:
+        """Run one batched prediction per group of requests sharing the same DV keys"""
+        mvs = self.model_manager._mv_order
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        
+        # Requests with different DV key sets need different fallbacks - predict them separately
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for i, (_, dv_values, _, _) in enumerate(batch):
+            groups.setdefault(tuple(sorted(dv_values)), []).append(i)
+        
+        for dv_keys, indices in groups.items():
+            mv_matrix = np.array([[batch[i][0][mv_id] for mv_id in mvs] for i in indices], dtype=np.float64)
+            dv_matrix = {dv_id: np.array([batch[i][1][dv_id] for i in indices], dtype=np.float64) for dv_id in dv_keys}
+            want_std = any(batch[i][2] for i in indices)
+            
+            out = self.model_manager.predict_cascade_batch(mv_matrix, dv_matrix, return_uncertainty=want_std)
+            
+            for row, i in enumerate(indices):
+                mv_values, dv_values, return_uncertainty, _ = batch[i]
+                result = {
+                    'predicted_cvs': {cv_id: float(values[row]) for cv_id, values in out['predicted_cvs'].items()},
+                    'predicted_target': float(out['predicted_target'][row]),
+                    'is_feasible': bool(out['is_feasible'][row]),
+                    'constraint_violations': [],
+                    'mv_inputs': mv_values,
+                    'dv_inputs': dv_values
+                }
+                if return_uncertainty:
+                    result['cv_uncertainties'] = {cv_id: float(values[row]) for cv_id, values in out['cv_uncertainties'].items()}
+                    result['target_uncertainty'] = float(out['target_uncertainty'][row])
+                results[i] = result
+        
+        return results
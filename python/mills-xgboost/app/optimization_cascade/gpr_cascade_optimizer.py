@@ -6,16 +6,104 @@ Supports uncertainty-aware optimization strategies.
 """
 
 import optuna
-from typing import Dict, Optional
+import numpy as np
+from typing import Dict, List, Optional, Any, Literal
 from pydantic import BaseModel
+from joblib import Parallel, delayed
+from concurrent.futures import ThreadPoolExecutor
+import os
+import hashlib
+import json
+import shutil
+import tempfile
+import threading
 import time
+import uuid
 import logging
 
 from .gpr_cascade_models import GPRCascadeModelManager
+from ._numba_utils import compute_objectives
+
+logger = logging.getLogger(__name__)
 
 # Suppress Optuna's verbose logging
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
+# Quasi-random trials before switching to TPE with sampler="qmc_tpe"
+QMC_WARMUP_TRIALS = 32
+
+# Best feasible MVs of past runs, per mill, enqueued as the first trials of new runs
+# with (approximately) the same DVs when a request opts in with warm_start=True.
+# Stored outside the model directories and tied to the trained models: a retrain
+# (new metadata.json) discards the stored optima of the previous models.
+WARM_START_DIR = os.environ.get("GPR_WARM_START_DIR", os.path.join(tempfile.gettempdir(), "gpr_warm_start"))
+WARM_START_SEEDS = 8
+_WARM_START_LOCK = threading.Lock()
+
+
+class _QMCThenTPESampler(optuna.samplers.BaseSampler):
+    """
+    Sobol (QMC) sampling for the first warmup_trials trials, TPE afterwards
+    
+    The sampler is picked per trial from its number, so concurrent ask() calls
+    (threads or worker processes sharing the study) never see the study's
+    sampler being swapped mid-run.
+    """
+    
+    def __init__(self, seed: int, warmup_trials: int = QMC_WARMUP_TRIALS):
+        self._qmc = optuna.samplers.QMCSampler(seed=seed, scramble=True)
+        self._tpe = optuna.samplers.TPESampler(seed=seed)
+        self._warmup_trials = warmup_trials
+    
+    def _sampler(self, trial) -> optuna.samplers.BaseSampler:
+        return self._qmc if trial.number < self._warmup_trials else self._tpe
+    
+    def infer_relative_search_space(self, study, trial):
+        return self._sampler(trial).infer_relative_search_space(study, trial)
+    
+    def sample_relative(self, study, trial, search_space):
+        return self._sampler(trial).sample_relative(study, trial, search_space)
+    
+    def sample_independent(self, study, trial, param_name, param_distribution):
+        return self._sampler(trial).sample_independent(study, trial, param_name, param_distribution)
+    
+    def before_trial(self, study, trial):
+        self._sampler(trial).before_trial(study, trial)
+    
+    def after_trial(self, study, trial, state, values):
+        self._sampler(trial).after_trial(study, trial, state, values)
+    
+    def reseed_rng(self):
+        self._qmc.reseed_rng()
+        self._tpe.reseed_rng()
+
+
+def _make_sampler(name: str, seed: int) -> optuna.samplers.BaseSampler:
+    """Optuna sampler for a GPROptimizationRequest.sampler name"""
+    if name == "cma":
+        return optuna.samplers.CmaEsSampler(seed=seed)
+    if name == "qmc":
+        return optuna.samplers.QMCSampler(seed=seed, scramble=True)
+    if name == "qmc_tpe":
+        return _QMCThenTPESampler(seed=seed)
+    return optuna.samplers.TPESampler(seed=seed)
+
+
+def _journal_storage(path: str) -> optuna.storages.BaseStorage:
+    """Optuna journal storage backed by a file (shared by worker processes without a database)"""
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:  # optuna < 4.0
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+    return optuna.storages.JournalStorage(JournalFileBackend(path))
+
+
+def _open_storage(storage: Optional[str], journal_path: Optional[str]):
+    """Storage for a study: the request's RDB URL, else the journal file (None: in-memory)"""
+    if journal_path is not None:
+        return _journal_storage(journal_path)
+    return storage
+
 
 class GPROptimizationRequest(BaseModel):
     """Request model for GPR cascade optimization"""
@@ -27,6 +115,12 @@ class GPROptimizationRequest(BaseModel):
     n_trials: int = 100
     use_uncertainty: bool = False  # If True, optimize for robust solutions (mean - k*std)
     uncertainty_weight: float = 1.0  # Weight for uncertainty penalty
+    batch_size: int = 8  # Trials sampled per batched GPR prediction
+    n_jobs: int = 1  # Worker processes sharing one study
+    n_threads: int = 1  # Threads sharing one in-process study (GP predict releases the GIL in BLAS)
+    sampler: Literal["tpe", "cma", "qmc", "qmc_tpe"] = "tpe"  # qmc_tpe: Sobol warm-up, then TPE
+    storage: Optional[str] = None  # Optuna RDB URL, e.g. "sqlite:///gpr_study.db" (run study deleted afterwards); temporary journal file when n_jobs > 1
+    warm_start: bool = False  # Seed the study with the best MVs of earlier runs on similar DVs (opt-in)
 
 
 class GPROptimizationResult(BaseModel):
@@ -65,121 +159,79 @@ class GPRCascadeOptimizer:
         
         start_time = time.time()
         
-        # Store best result
-        best_result = {
-            'mv_values': None,
-            'cv_values': None,
-            'target_value': None,
-            'target_uncertainty': None,
-            'is_feasible': False
-        }
+        # Create Optuna study - shared through the request's RDB storage, or a temporary
+        # journal file (no SQLite write-lock contention), when trials run in worker processes
+        n_jobs = max(1, request.n_jobs)
+        if n_jobs > 1 and self.model_manager.mill_number is None:
+            logger.warning("⚠️ Parallel GPR optimization needs a mill-specific model manager - running single-process")
+            n_jobs = 1
+        temp_dir = None
+        journal_path = None
+        study = None
+        if n_jobs > 1 and request.storage is None:
+            temp_dir = tempfile.mkdtemp(prefix="gpr_optuna_")
+            journal_path = os.path.join(temp_dir, "study.journal")
         
-        def objective(trial: optuna.Trial) -> float:
-            """Optuna objective function"""
-            # Sample MV values
-            mv_values = {}
-            for mv_name, (min_val, max_val) in request.mv_bounds.items():
-                mv_values[mv_name] = trial.suggest_float(mv_name, min_val, max_val)
+        try:
+            storage = _open_storage(request.storage, journal_path)
+            direction = "maximize" if request.maximize else "minimize"
+            study = optuna.create_study(
+                direction=direction,
+                sampler=_make_sampler(request.sampler, seed=42),
+                storage=storage,
+                study_name=f"gpr_cascade_{uuid.uuid4().hex}" if storage is not None else None,
+                load_if_exists=True
+            )
+            if request.warm_start:
+                for params in self._load_warm_start(request):
+                    study.enqueue_trial(params)
             
-            # Predict using GPR cascade with uncertainty
-            try:
-                result = self.model_manager.predict_cascade(
-                    mv_values=mv_values,
-                    dv_values=request.dv_values,
-                    return_uncertainty=True
+            # Run optimization
+            if n_jobs == 1 and request.n_threads > 1:
+                # Threads share the in-memory study; trial state is read back from user attributes
+                shares = self._split_trials(request.n_trials, request.n_threads)
+                with ThreadPoolExecutor(max_workers=len(shares)) as executor:
+                    futures = [executor.submit(self._run_trials, study, request, n_trials) for n_trials in shares]
+                    for future in futures:
+                        future.result()
+            elif n_jobs == 1:
+                self._run_trials(study, request, request.n_trials)
+            else:
+                # Split the trials across workers; each worker samples with its own seed so
+                # they don't propose identical points before seeing each other's results
+                shares = self._split_trials(request.n_trials, n_jobs)
+                Parallel(n_jobs=len(shares), backend="loky")(
+                    delayed(_optimize_worker)(
+                        self.model_manager.base_model_path, self.model_manager.mill_number,
+                        request, request.storage, journal_path, study.study_name, 42 + worker_id, n_trials
+                    )
+                    for worker_id, n_trials in enumerate(shares)
                 )
-                
-                predicted_target = result['predicted_target']
-                target_uncertainty = result.get('target_uncertainty', 0.0)
-                predicted_cvs = result['predicted_cvs']
-                is_feasible = result['is_feasible']
-                
-                # Check CV constraints
-                constraint_penalty = 0.0
-                for cv_name, (min_val, max_val) in request.cv_bounds.items():
-                    if cv_name in predicted_cvs:
-                        cv_value = predicted_cvs[cv_name]
-                        if cv_value < min_val:
-                            constraint_penalty += self.penalty_factor * (min_val - cv_value) ** 2
-                            is_feasible = False
-                        elif cv_value > max_val:
-                            constraint_penalty += self.penalty_factor * (cv_value - max_val) ** 2
-                            is_feasible = False
-                
-                # Calculate objective value
-                if request.use_uncertainty:
-                    # Robust optimization: minimize (or maximize) mean ± k*std
-                    # For minimization: mean + k*std (prefer low mean and low uncertainty)
-                    # For maximization: mean - k*std (prefer high mean and low uncertainty)
-                    if request.maximize:
-                        objective_value = predicted_target - request.uncertainty_weight * target_uncertainty
-                    else:
-                        objective_value = predicted_target + request.uncertainty_weight * target_uncertainty
-                else:
-                    # Standard optimization: just use mean prediction
-                    objective_value = predicted_target
-                
-                # Add constraint penalty
-                objective_value += constraint_penalty
-                
-                # Update best result if this is better and feasible
-                nonlocal best_result
-                if is_feasible:
-                    if best_result['mv_values'] is None:
-                        # First feasible solution
-                        best_result = {
-                            'mv_values': mv_values,
-                            'cv_values': predicted_cvs,
-                            'target_value': predicted_target,
-                            'target_uncertainty': target_uncertainty,
-                            'is_feasible': True
-                        }
-                    else:
-                        # Compare with current best
-                        current_best = best_result['target_value']
-                        if request.maximize:
-                            if predicted_target > current_best:
-                                best_result = {
-                                    'mv_values': mv_values,
-                                    'cv_values': predicted_cvs,
-                                    'target_value': predicted_target,
-                                    'target_uncertainty': target_uncertainty,
-                                    'is_feasible': True
-                                }
-                        else:
-                            if predicted_target < current_best:
-                                best_result = {
-                                    'mv_values': mv_values,
-                                    'cv_values': predicted_cvs,
-                                    'target_value': predicted_target,
-                                    'target_uncertainty': target_uncertainty,
-                                    'is_feasible': True
-                                }
-                
-                # Return objective for Optuna (always minimize)
-                if request.maximize:
-                    return -objective_value  # Negate for maximization
-                else:
-                    return objective_value
-                
-            except Exception as e:
-                print(f"⚠️ Prediction failed in trial: {e}")
-                return float('inf') if not request.maximize else float('-inf')
-        
-        # Create Optuna study
-        direction = "maximize" if request.maximize else "minimize"
-        study = optuna.create_study(
-            direction=direction,
-            sampler=optuna.samplers.TPESampler(seed=42)
-        )
-        
-        # Run optimization
-        study.optimize(objective, n_trials=request.n_trials, show_progress_bar=False)
+            
+            # Get best trial and the best feasible solution
+            completed = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+            best_trial_number = study.best_trial.number if completed else -1
+            best_result = self._best_feasible(study, request.maximize)
+        finally:
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            elif request.storage is not None and study is not None:
+                # Each run creates a uniquely named study - don't leave it behind in the user's database
+                try:
+                    optuna.delete_study(study_name=study.study_name, storage=storage)
+                except Exception as e:
+                    logger.warning("⚠️ Could not delete study %s from %s: %s", study.study_name, request.storage, e)
         
         optimization_time = time.time() - start_time
         
-        # Get best trial
-        best_trial = study.best_trial
+        # Uncertainty of the reported best solution, if trials skipped the std computation
+        if best_result['mv_values'] is not None and best_result['target_uncertainty'] is None:
+            _, best_result['target_uncertainty'], _ = self.model_manager.predict_cascade_fast(
+                best_result['mv_values'], request.dv_values, return_uncertainty=True
+            )
+        
+        if request.warm_start and best_result['is_feasible']:
+            self._save_warm_start(request, best_result['mv_values'], best_result['target_value'])
         
         return GPROptimizationResult(
             best_mv_values=best_result['mv_values'] or {},
@@ -188,6 +240,230 @@ class GPRCascadeOptimizer:
             best_target_uncertainty=best_result['target_uncertainty'],
             is_feasible=best_result['is_feasible'],
             n_trials=request.n_trials,
-            best_trial_number=best_trial.number,
+            best_trial_number=best_trial_number,
             optimization_time=optimization_time
         )
+    
+    def _run_trials(self, study: optuna.Study, request: GPROptimizationRequest, n_trials: int):
+        """
+        Run n_trials batched ask/tell trials on the study
+        
+        Each trial records its predicted target, uncertainty, CVs and feasibility in
+        the "cascade" user attribute, so results from worker processes sharing an
+        storage-backed study are available to the parent.
+        """
+        batch_size = max(1, request.batch_size)
+        mv_order = self.model_manager.mv_order
+        
+        # Sampled MVs are written straight into a reused buffer in the model's MV order;
+        # MVs the model doesn't use are still sampled (they are part of the search space)
+        mv_index = {mv_id: j for j, mv_id in enumerate(mv_order)}
+        mv_columns = tuple(
+            (mv_name, min_val, max_val, mv_index.get(mv_name))
+            for mv_name, (min_val, max_val) in request.mv_bounds.items()
+        )
+        missing_mvs = [mv_id for mv_id in mv_order if mv_id not in request.mv_bounds]
+        if missing_mvs:
+            logger.warning("⚠️ No bounds for model MVs %s - trials cannot be evaluated", missing_mvs)
+        mv_buffer = np.empty((batch_size, len(mv_order)), dtype=np.float64)
+        
+        # CV bounds as arrays for the vectorized constraint check
+        cv_names = list(request.cv_bounds)
+        cv_lo = np.fromiter((request.cv_bounds[name][0] for name in cv_names), dtype=np.float64, count=len(cv_names))
+        cv_hi = np.fromiter((request.cv_bounds[name][1] for name in cv_names), dtype=np.float64, count=len(cv_names))
+        
+        # Run optimization: ask a batch of trials, predict all of them with one
+        # GPR call per model, then tell the results back to the sampler
+        n_asked = 0
+        while n_asked < n_trials:
+            trials = [study.ask() for _ in range(min(batch_size, n_trials - n_asked))]
+            n_asked += len(trials)
+            
+            # Sample MV values
+            for i, trial in enumerate(trials):
+                for mv_name, min_val, max_val, j in mv_columns:
+                    value = trial.suggest_float(mv_name, min_val, max_val)
+                    if j is not None:
+                        mv_buffer[i, j] = value
+            
+            if missing_mvs:
+                for trial in trials:
+                    study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+                continue
+            
+            # Predict using GPR cascade - GP std only when the objective uses it
+            try:
+                batch = self.model_manager.predict_cascade_batch(
+                    mv_buffer[:len(trials)],
+                    dv_values=request.dv_values,
+                    return_uncertainty=request.use_uncertainty
+                )
+            except (KeyError, ValueError, np.linalg.LinAlgError) as e:
+                # Missing DV/model inputs or a numerically failed GP solve. Prune rather
+                # than report an infinite value, which would distort TPE's density estimates.
+                logger.debug("⚠️ Prediction failed in trial batch: %s", e)
+                for trial in trials:
+                    study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+                continue
+            
+            # Penalized objectives and CV feasibility for the whole batch in one compiled pass.
+            # CVs the models don't predict stay NaN, which never violates a bound.
+            cv_matrix = np.full((len(trials), len(cv_names)), np.nan)
+            for j, cv_name in enumerate(cv_names):
+                if cv_name in batch['predicted_cvs']:
+                    cv_matrix[:, j] = batch['predicted_cvs'][cv_name]
+            target_means = np.ascontiguousarray(batch['predicted_target'], dtype=np.float64)
+            target_stds = batch.get('target_uncertainty')
+            objectives, cv_feasible = compute_objectives(
+                target_means,
+                np.ascontiguousarray(target_stds, dtype=np.float64) if target_stds is not None else np.zeros_like(target_means),
+                cv_matrix, cv_lo, cv_hi,
+                self.penalty_factor, request.uncertainty_weight,
+                request.use_uncertainty, request.maximize
+            )
+            feasible = batch['is_feasible'] & cv_feasible
+            
+            # Only feasible trials can be reported, so only they get the full CV/target
+            # state; infeasible ones are just flagged
+            cv_items = tuple(batch['predicted_cvs'].items())
+            target_values = target_means.tolist()
+            target_std_values = target_stds.tolist() if target_stds is not None else None
+            for i, (trial, objective_value, is_feasible) in enumerate(zip(trials, objectives.tolist(), feasible.tolist())):
+                if is_feasible:
+                    trial.set_user_attr("cascade", {
+                        "feasible": True,
+                        "target": target_values[i],
+                        "uncertainty": target_std_values[i] if target_std_values is not None else None,
+                        "cv_values": {cv_name: float(values[i]) for cv_name, values in cv_items}
+                    })
+                else:
+                    trial.set_user_attr("cascade", {"feasible": False})
+                study.tell(trial, objective_value)
+    
+    def _warm_start_path(self) -> Optional[str]:
+        """Warm-start file for the manager's mill directory (None if there is no such directory)"""
+        model_dir = self.model_manager.model_save_path
+        if not model_dir or not os.path.isdir(model_dir):
+            return None
+        name = hashlib.sha1(os.path.abspath(model_dir).encode()).hexdigest()[:16]
+        return os.path.join(WARM_START_DIR, f"{name}.json")
+    
+    def _models_fingerprint(self) -> Optional[int]:
+        """Identifies the trained models: mtime of the mill's metadata.json (rewritten on every training)"""
+        try:
+            return os.stat(os.path.join(self.model_manager.model_save_path, "metadata.json")).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+    
+    @staticmethod
+    def _warm_start_key(request: GPROptimizationRequest) -> str:
+        """Cache key: target, direction and DVs rounded to one decimal"""
+        dvs = ",".join(f"{name}={round(float(value), 1)}" for name, value in sorted(request.dv_values.items()))
+        return f"{request.target_variable}|{'max' if request.maximize else 'min'}|{dvs}"
+    
+    def _load_warm_start(self, request: GPROptimizationRequest) -> List[Dict[str, float]]:
+        """Stored MV sets for the request's DVs that fit inside its MV bounds"""
+        path = self._warm_start_path()
+        if path is None or not os.path.exists(path):
+            return []
+        try:
+            with open(path, 'r') as f:
+                store = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Ignoring unreadable warm-start file %s: %s", path, e)
+            return []
+        # Optima found with previously trained models are not valid seeds
+        if store.get("models") != self._models_fingerprint():
+            return []
+        entries = store.get("entries", {}).get(self._warm_start_key(request), [])
+        
+        seeds = []
+        for entry in entries:
+            params = entry["mv_values"]
+            if set(params) == set(request.mv_bounds) and all(
+                request.mv_bounds[name][0] <= value <= request.mv_bounds[name][1] for name, value in params.items()
+            ):
+                seeds.append(params)
+        return seeds[:WARM_START_SEEDS]
+    
+    def _save_warm_start(self, request: GPROptimizationRequest, mv_values: Dict[str, float], target_value: float):
+        """Record a feasible optimum, keeping the best WARM_START_SEEDS per key"""
+        path = self._warm_start_path()
+        if path is None:
+            return
+        key = self._warm_start_key(request)
+        fingerprint = self._models_fingerprint()
+        with _WARM_START_LOCK:
+            try:
+                with open(path, 'r') as f:
+                    store = json.load(f)
+            except (OSError, ValueError):
+                store = {}
+            if store.get("models") != fingerprint:
+                # Models were retrained - drop the optima of the old models
+                store = {"models": fingerprint, "entries": {}}
+            
+            entries = [entry for entry in store["entries"].get(key, []) if entry["mv_values"] != mv_values]
+            entries.append({"mv_values": mv_values, "target_value": target_value})
+            sign = -1.0 if request.maximize else 1.0
+            entries.sort(key=lambda entry: sign * entry["target_value"])
+            store["entries"][key] = entries[:WARM_START_SEEDS]
+            
+            os.makedirs(WARM_START_DIR, exist_ok=True)
+            # Write-then-rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(store, f)
+            os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _split_trials(n_trials: int, n_workers: int) -> List[int]:
+        """Near-equal, non-empty per-worker trial counts"""
+        n_workers = max(1, min(n_workers, n_trials))
+        return [n_trials // n_workers + (1 if k < n_trials % n_workers else 0) for k in range(n_workers)]
+    
+    @staticmethod
+    def _best_feasible(study: optuna.Study, maximize: bool) -> Dict[str, Any]:
+        """Best feasible trial by predicted target, in the result layout used by optimize()"""
+        feasible = [
+            trial for trial in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+            if trial.user_attrs.get("cascade", {}).get("feasible")
+        ]
+        if not feasible:
+            return {
+                'mv_values': None,
+                'cv_values': None,
+                'target_value': None,
+                'target_uncertainty': None,
+                'is_feasible': False
+            }
+        
+        # Sign-aware comparison: the best trial has the lowest sign * target
+        sign = -1.0 if maximize else 1.0
+        best = min(feasible, key=lambda trial: sign * trial.user_attrs["cascade"]["target"])
+        cascade = best.user_attrs["cascade"]
+        return {
+            'mv_values': dict(best.params),
+            'cv_values': cascade["cv_values"],
+            'target_value': cascade["target"],
+            'target_uncertainty': cascade["uncertainty"],
+            'is_feasible': True
+        }
+
+def _optimize_worker(base_path: str, mill_number: int, request: GPROptimizationRequest,
+                     storage: Optional[str], journal_path: Optional[str], study_name: str,
+                     seed: int, n_trials: int):
+    """Run a share of a shared-storage study's trials in a worker process
+
+    The study is reopened from the same storage as the parent's: the RDB URL,
+    or the journal file when the parent created a temporary one.
+    """
+    model_manager = GPRCascadeModelManager.get_or_load(base_path, mill_number)
+    if model_manager is None:
+        raise RuntimeError(f"Failed to load GPR models for Mill {mill_number} in optimization worker")
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=_open_storage(storage, journal_path),
+        sampler=_make_sampler(request.sampler, seed=seed)
+    )
+    GPRCascadeOptimizer(model_manager)._run_trials(study, request, n_trials)
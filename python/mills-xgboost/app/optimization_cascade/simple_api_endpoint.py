@@ -5,6 +5,7 @@ Simplified API endpoint that uses the working direct approach
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict
+import asyncio
 import sys
 import os
 
@@ -41,7 +42,9 @@ async def simple_optimize(request: SimpleOptRequest):
         model_path = os.path.join(os.path.dirname(__file__), "cascade_models")
         model_manager = CascadeModelManager(model_path, mill_number=request.mill_number)
         
-        if not model_manager.load_models():
+        # Model loading and the Optuna run are blocking - keep them off the event loop
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, model_manager.load_models):
             raise HTTPException(status_code=400, detail=f"Failed to load models for Mill {request.mill_number}")
         
         print(f"   Models loaded successfully")
@@ -54,7 +57,7 @@ async def simple_optimize(request: SimpleOptRequest):
         print(f"   Starting optimization...")
         
         # Run optimization using the working direct approach
-        result = optimize_cascade(
+        result = await loop.run_in_executor(None, lambda: optimize_cascade(
             model_manager=model_manager,
             mv_bounds=mv_bounds,
             cv_bounds=cv_bounds,
@@ -62,7 +65,7 @@ async def simple_optimize(request: SimpleOptRequest):
             target_variable=request.target_variable,
             maximize=request.maximize,
             n_trials=request.n_trials
-        )
+        ))
         
         print(f"   Optimization completed successfully!")
         
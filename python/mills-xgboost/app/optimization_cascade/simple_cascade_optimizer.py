@@ -4,11 +4,14 @@ Simple Bayesian Optimization for Cascade Models with Optuna
 Minimal implementation that accepts MV/CV/DV limits and returns optimal values.
 """
 
+import copy
+import math
 import numpy as np
 import optuna
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Callable
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 
 from .cascade_models import CascadeModelManager
 
@@ -18,6 +21,90 @@ logger = logging.getLogger(__name__)
 # Suppress Optuna's verbose logging
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
+
+def make_tpe_sampler(n_params: int) -> optuna.samplers.TPESampler:
+    """
+    TPE sampler for a cascade MV search space
+    
+    MVs act on the CVs jointly, so the sampler models them with a multivariate
+    density instead of independent 1-D ones. The random warm-up grows with the
+    number of MVs, and constant_liar keeps concurrently running trials from
+    proposing the same region.
+    
+    Args:
+        n_params: Number of sampled MVs
+    """
+    return optuna.samplers.TPESampler(
+        multivariate=True,
+        group=True,
+        constant_liar=True,
+        n_startup_trials=max(10, 2 * n_params)
+    )
+
+def mv_sampling_spec(mv_bounds: Dict[str, Tuple[float, float]],
+                     mv_steps: Optional[Dict[str, float]]
+                     ) -> List[Tuple[str, str, float, float, Optional[float]]]:
+    """
+    Resolve the per-MV sampling spec (param name, MV id, min, max, step) for a run
+    
+    Optuna's stepped suggest_float needs (max - min) to be a multiple of the step;
+    otherwise it warns and silently lowers the upper bound. Stepped MVs therefore
+    have their bounds moved inward onto the step grid. An MV whose range holds no
+    grid point is sampled continuously over its original bounds.
+    
+    Args:
+        mv_bounds: {mv_id: (min, max)} search bounds
+        mv_steps: {mv_id: step} sampling resolution; MVs without one are continuous
+    """
+    mv_steps = mv_steps or {}
+    spec = []
+    for mv_name, (min_val, max_val) in mv_bounds.items():
+        step = mv_steps.get(mv_name)
+        if step:
+            # Small tolerance so bounds already on the grid aren't moved by float error
+            k_lo = math.ceil(min_val / step - 1e-9)
+            k_hi = math.floor(max_val / step + 1e-9)
+            if k_lo <= k_hi:
+                min_val, max_val = round(k_lo * step, 10), round(k_hi * step, 10)
+            else:
+                step = None
+        spec.append((f"mv_{mv_name}", mv_name, min_val, max_val, step))
+    return spec
+
+def cached_cascade_predictor(model_manager: CascadeModelManager, dv_values: Dict[str, float],
+                             mv_spec: List[Tuple[str, str, float, float, Optional[float]]],
+                             maxsize: int = 4096
+                             ) -> Callable[[Dict[str, float]], Dict[str, Any]]:
+    """
+    predict_cascade() for one optimization run, memoized on the suggested MV values
+    
+    MVs sampled with a step take values on Optuna's grid (min + k*step), so late in
+    a run TPE keeps proposing the same grid points around the incumbent; each point
+    is predicted once. The key is the exact suggested values, so the cascade is
+    always evaluated at the point the trial reports.
+    The DVs are fixed for the run, so the cache is scoped to this predictor.
+    
+    Args:
+        model_manager: Loaded cascade model manager
+        dv_values: Fixed DV values of the run
+        mv_spec: (param name, MV id, min, max, step) per sampled MV
+        maxsize: Maximum number of cached predictions
+        
+    Returns:
+        Function mapping an {mv_id: value} dict to (a copy of) the predict_cascade() result
+    """
+    mv_names = [mv_name for _, mv_name, _, _, _ in mv_spec]
+    
+    @lru_cache(maxsize=maxsize)
+    def predict_point(key: Tuple[float, ...]) -> Dict[str, Any]:
+        return model_manager.predict_cascade(dict(zip(mv_names, key)), dv_values)
+    
+    def predict(mv_values: Dict[str, float]) -> Dict[str, Any]:
+        # Copy: the cached result is shared by every trial that hits it
+        return copy.deepcopy(predict_point(tuple(mv_values[mv_name] for mv_name in mv_names)))
+    
+    return predict
+
 @dataclass
 class OptimizationRequest:
     """Simple optimization request"""
@@ -31,6 +118,8 @@ class OptimizationRequest:
     maximize: bool = False  # True = maximize, False = minimize
     n_trials: int = 100
     timeout: Optional[int] = None
+    n_jobs: int = 1  # Concurrent trials (XGBoost prediction releases the GIL)
+    mv_steps: Optional[Dict[str, float]] = None  # Sampling resolution per MV; continuous if missing
 
 @dataclass 
 class OptimizationResult:
@@ -69,14 +158,20 @@ class SimpleCascadeOptimizer:
         
         # Create Optuna study
         direction = 'maximize' if request.maximize else 'minimize'
-        study = optuna.create_study(direction=direction)
+        study = optuna.create_study(direction=direction, sampler=make_tpe_sampler(len(request.mv_bounds)))
+        
+        # MV sampling spec (param name, MV id, min, max, step), resolved once per run
+        mv_spec = mv_sampling_spec(request.mv_bounds, request.mv_steps)
+        
+        # Memoized cascade prediction over the suggested MV values
+        predict = cached_cascade_predictor(self.model_manager, request.dv_values, mv_spec)
         
         # Create objective function
         def objective(trial):
-            return self._evaluate_trial(trial, request)
+            return self._evaluate_trial(trial, request, mv_spec, predict)
         
         # Run optimization
-        study.optimize(objective, n_trials=request.n_trials, timeout=request.timeout)
+        study.optimize(objective, n_trials=request.n_trials, timeout=request.timeout, n_jobs=request.n_jobs)
         
         # Get best trial
         best_trial = study.best_trial
@@ -97,13 +192,17 @@ class SimpleCascadeOptimizer:
         
         return result
     
-    def _evaluate_trial(self, trial: optuna.trial.Trial, request: OptimizationRequest) -> float:
+    def _evaluate_trial(self, trial: optuna.trial.Trial, request: OptimizationRequest,
+                        mv_spec: List[Tuple[str, str, float, float, Optional[float]]],
+                        predict: Callable[[Dict[str, float]], Dict[str, Any]]) -> float:
         """
         Evaluate a single optimization trial
         
         Args:
             trial: Optuna trial object
             request: Optimization request
+            mv_spec: (param name, MV id, min, max, step) per sampled MV
+            predict: Cascade predictor for this run, see cached_cascade_predictor()
             
         Returns:
             Objective value (target + penalties)
@@ -111,11 +210,11 @@ class SimpleCascadeOptimizer:
         try:
             # Sample MV values within bounds
             mv_values = {}
-            for mv_name, (min_val, max_val) in request.mv_bounds.items():
-                mv_values[mv_name] = trial.suggest_float(f"mv_{mv_name}", min_val, max_val)
+            for param_name, mv_name, min_val, max_val, step in mv_spec:
+                mv_values[mv_name] = trial.suggest_float(param_name, min_val, max_val, step=step)
             
             # Predict cascade: MVs → CVs → Target
-            prediction = self.model_manager.predict_cascade(mv_values, request.dv_values)
+            prediction = predict(mv_values)
             
             # Get target value
             target_value = prediction['predicted_target']
@@ -146,9 +245,9 @@ class SimpleCascadeOptimizer:
         Returns:
             Penalty value (0 if no violations)
         """
-        penalty = 0.0
         penalty_factor = 1000.0  # Large penalty for constraint violations
         
+        penalty = 0.0
         for cv_name, cv_value in predicted_cvs.items():
             if cv_name in cv_bounds:
                 min_val, max_val = cv_bounds[cv_name]
@@ -205,9 +304,9 @@ def get_default_bounds() -> Tuple[Dict[str, Tuple[float, float]],
     Returns:
         Tuple of (mv_bounds, cv_bounds, default_dv_values)
     """
-    from .old_files_to_delete.variable_classifier import VariableClassifier
+    from .variable_classifier import get_default_classifier
     
-    classifier = VariableClassifier()
+    classifier = get_default_classifier()
     
     # Get MV bounds
     mv_bounds = classifier.get_mv_bounds()
@@ -14,14 +14,34 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Minimum series length for which the GPU kernel beats CPU STUMP
+GPU_MIN_LENGTH = 50_000
+
+
+def _cuda_available() -> bool:
+    """Check whether a CUDA device is usable by numba (and so by STUMPY)"""
+    try:
+        from numba import cuda
+        return cuda.is_available()
+    except Exception:
+        return False
+
 
 class MatrixProfileComputer:
     """
     Computes matrix profiles for time series pattern analysis
     """
     
-    def __init__(self):
-        """Initialize matrix profile computer"""
+    def __init__(self, accelerator: str = 'auto'):
+        """
+        Initialize matrix profile computer
+        
+        Args:
+            accelerator: Compute device for STUMP ('auto', 'cpu' or 'gpu')
+        """
+        if accelerator not in ('auto', 'cpu', 'gpu'):
+            raise ValueError(f"Unknown accelerator: {accelerator}")
+        self.accelerator = accelerator
         self.matrix_profile = None
         self.matrix_profile_index = None
         self.window_size = None
@@ -30,6 +50,35 @@ class MatrixProfileComputer:
         self.cac_score = None
         self.data = None  # Store reference to original data for motifs()
         
+    def _use_gpu(self, n_timepoints: int, accelerator: Optional[str] = None) -> bool:
+        """Decide whether univariate STUMP should run on the GPU (accelerator overrides self.accelerator)"""
+        accelerator = accelerator or self.accelerator
+        if accelerator == 'cpu':
+            return False
+        if accelerator == 'gpu':
+            if not _cuda_available():
+                logger.warning("GPU accelerator requested but CUDA is not available, using CPU")
+                return False
+            return True
+        return n_timepoints > GPU_MIN_LENGTH and _cuda_available()
+    
+    def _stump(self, T: np.ndarray, window_size: int, accelerator: Optional[str] = None) -> np.ndarray:
+        """
+        Compute a univariate matrix profile on the best available device
+        
+        Args:
+            T: Time series data (1D array)
+            window_size: Subsequence window size
+            accelerator: Compute device for this call; None uses self.accelerator
+            
+        Returns:
+            STUMP result array (profile, index, left index, right index)
+        """
+        if self._use_gpu(len(T), accelerator):
+            logger.info(f"Using GPU STUMP for {len(T)} timepoints")
+            return stumpy.gpu_stump(T, m=window_size, device_id=0)
+        return stumpy.stump(T, m=window_size)
+    
     def compute_univariate_mp(self, 
                               data: pd.Series,
                               window_size: int) -> Tuple[np.ndarray, np.ndarray]:
@@ -46,7 +95,7 @@ class MatrixProfileComputer:
         logger.info(f"Computing univariate matrix profile with window={window_size}")
         
         # Compute matrix profile using STUMP (univariate)
-        mp = stumpy.stump(data.values, m=window_size)
+        mp = self._stump(data.to_numpy(dtype=np.float64), window_size)
         
         # Extract matrix profile and index
         matrix_profile = mp[:, 0]  # Distance to nearest neighbor
@@ -58,13 +107,15 @@ class MatrixProfileComputer:
     
     def compute_multivariate_mp(self,
                                data: pd.DataFrame,
-                               window_size: int) -> Tuple[np.ndarray, np.ndarray]:
+                               window_size: int,
+                               accelerator: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Compute multivariate matrix profile for multiple time series
         
         Args:
             data: Time series data (2D DataFrame)
             window_size: Subsequence window size
+            accelerator: Compute device for this call; None uses self.accelerator
             
         Returns:
             Tuple of (matrix_profile, matrix_profile_index)
@@ -90,13 +141,19 @@ class MatrixProfileComputer:
             f"Array shape for STUMPY: {data_array.shape} (features x timepoints)"
         )
         
-        # Compute multivariate matrix profile using MSTUMP
-        logger.info("Running MSTUMP (this may take a few minutes for large datasets)...")
-        matrix_profiles, profile_indices = stumpy.mstump(data_array, m=window_size)
-        
-        # Aggregate across dimensions (mean distance per subsequence)
-        matrix_profile = np.nanmean(matrix_profiles, axis=0)
-        matrix_profile_index = profile_indices[0].astype(int)
+        if data_array.shape[0] == 1:
+            # Single feature: MSTUMP reduces to STUMP, which has a GPU kernel
+            mp = self._stump(data_array[0], window_size, accelerator)
+            matrix_profile = mp[:, 0].astype(np.float64)
+            matrix_profile_index = mp[:, 1].astype(int)
+        else:
+            # Compute multivariate matrix profile using MSTUMP (CPU only in STUMPY)
+            logger.info("Running MSTUMP (this may take a few minutes for large datasets)...")
+            matrix_profiles, profile_indices = stumpy.mstump(data_array, m=window_size)
+            
+            # Aggregate across dimensions (mean distance per subsequence)
+            matrix_profile = np.nanmean(matrix_profiles, axis=0)
+            matrix_profile_index = profile_indices[0].astype(int)
         
         logger.info(f"✅ Multivariate MP computed: {len(matrix_profile)} profile points")
         
@@ -141,7 +198,8 @@ class MatrixProfileComputer:
     def compute_mp_with_auto_window(self,
                                    data: pd.DataFrame,
                                    residence_time_minutes: int = 60,
-                                   sampling_freq_minutes: int = 1) -> Dict:
+                                   sampling_freq_minutes: int = 1,
+                                   accelerator: Optional[str] = None) -> Dict:
         """
         Compute matrix profile with automatic window size calculation
         
@@ -149,10 +207,15 @@ class MatrixProfileComputer:
             data: Normalized time series data
             residence_time_minutes: Process residence time
             sampling_freq_minutes: Data sampling frequency
+            accelerator: Compute device for this call ('auto', 'cpu' or 'gpu');
+                         None uses the instance's accelerator
             
         Returns:
             Dictionary with matrix profile results
         """
+        if accelerator is not None and accelerator not in ('auto', 'cpu', 'gpu'):
+            raise ValueError(f"Unknown accelerator: {accelerator}")
+        
         logger.info("=" * 80)
         logger.info("PHASE 2: MATRIX PROFILE COMPUTATION")
         logger.info("=" * 80)
@@ -172,7 +235,8 @@ class MatrixProfileComputer:
         
         matrix_profile, matrix_profile_index = self.compute_multivariate_mp(
             data, 
-            window_size
+            window_size,
+            accelerator
         )
         
         # Step 3: Analyze results
@@ -162,6 +162,10 @@ class SteadyStateExtractor:
         
         steady_state_df = pd.concat(all_steady_state_data, ignore_index=True)
         
+        # Categorical regime labels: few distinct values over many rows, so regime
+        # filtering and counting compare integer codes instead of Python strings
+        steady_state_df['regime_label'] = steady_state_df['regime_label'].astype('category')
+        
         # Calculate quality scores
         logger.info(f"\n[Step 3/3] Calculating quality scores...")
         
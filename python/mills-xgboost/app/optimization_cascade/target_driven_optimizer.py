@@ -5,15 +5,17 @@ Enhanced optimization that seeks specific target values and returns parameter di
 for uncertainty quantification and visualization.
 """
 
+import heapq
 import numpy as np
 import optuna
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Callable
 import logging
 from dataclasses import dataclass
 import pandas as pd
 from scipy import stats
 
 from .cascade_models import CascadeModelManager
+from .simple_cascade_optimizer import cached_cascade_predictor, make_tpe_sampler, mv_sampling_spec
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -44,6 +46,8 @@ class TargetOptimizationRequest:
     n_trials: int = 500  # Default 500 trials
     confidence_level: float = 0.90  # 90% confidence intervals
     timeout: Optional[int] = None
+    n_jobs: int = 1  # Concurrent trials (XGBoost prediction releases the GIL)
+    mv_steps: Optional[Dict[str, float]] = None  # Sampling resolution per MV; continuous if missing
 
 @dataclass 
 class TargetOptimizationResult:
@@ -105,14 +109,20 @@ class TargetDrivenCascadeOptimizer:
         logger.info(f"Trials: {request.n_trials}")
         
         # Create Optuna study (minimize distance from target)
-        study = optuna.create_study(direction='minimize')
+        study = optuna.create_study(direction='minimize', sampler=make_tpe_sampler(len(request.mv_bounds)))
+        
+        # MV sampling spec (param name, MV id, min, max, step), resolved once per run
+        mv_spec = mv_sampling_spec(request.mv_bounds, request.mv_steps)
+        
+        # Memoized cascade prediction over the suggested MV values
+        predict = cached_cascade_predictor(self.model_manager, request.dv_values, mv_spec)
         
         # Create objective function
         def objective(trial):
-            return self._target_seeking_objective(trial, request)
+            return self._target_seeking_objective(trial, request, mv_spec, predict)
         
         # Run optimization
-        study.optimize(objective, n_trials=request.n_trials, timeout=request.timeout)
+        study.optimize(objective, n_trials=request.n_trials, timeout=request.timeout, n_jobs=request.n_jobs)
         
         # Calculate tolerance threshold (absolute distance from target)
         tolerance_threshold = request.target_value * request.tolerance
@@ -120,27 +130,33 @@ class TargetDrivenCascadeOptimizer:
         # Debug: Log tolerance calculation
         logger.info(f"Target: {request.target_value}, Tolerance: {request.tolerance*100:.1f}%, Threshold: {tolerance_threshold:.4f}")
         
+        # Read the trials once (study.trials deep-copies them on every access) and
+        # compute all distance statistics from a single array
+        all_trials = study.get_trials(deepcopy=False)
+        valued_trials = [t for t in all_trials if t.value is not None]
+        trial_distances = np.fromiter((t.value for t in valued_trials), dtype=np.float64, count=len(valued_trials))
+        worst_distance = float(trial_distances.max()) if len(valued_trials) else float('inf')
+        
         # Extract successful trials (within tolerance)
         # trial.value represents the distance from target, so it should be <= tolerance_threshold
         successful_trials = [
-            trial for trial in study.trials 
-            if trial.value is not None and trial.value <= tolerance_threshold
+            trial for trial, distance in zip(valued_trials, trial_distances)
+            if distance <= tolerance_threshold
         ]
         
         # Debug: Log trial distances
-        if study.trials:
-            trial_distances = [t.value for t in study.trials if t.value is not None]
-            logger.info(f"Best distance: {min(trial_distances):.4f}, Worst: {max(trial_distances):.4f}")
+        if valued_trials:
+            logger.info(f"Best distance: {trial_distances.min():.4f}, Worst: {worst_distance:.4f}")
             logger.info(f"Trials within tolerance ({tolerance_threshold:.4f}): {len(successful_trials)}")
         
-        logger.info(f"Successful trials: {len(successful_trials)}/{len(study.trials)}")
+        logger.info(f"Successful trials: {len(successful_trials)}/{len(all_trials)}")
         
         # Fallback: If no trials meet strict tolerance, use best 10% of trials for distributions
-        if len(successful_trials) == 0 and len(study.trials) > 0:
+        if len(successful_trials) == 0 and len(all_trials) > 0:
             logger.info("No trials within strict tolerance, using best 10% of trials for distributions")
-            sorted_trials = sorted([t for t in study.trials if t.value is not None], key=lambda t: t.value)
-            top_10_percent = max(1, len(sorted_trials) // 10)
-            successful_trials = sorted_trials[:top_10_percent]
+            top_10_percent = max(1, len(valued_trials) // 10)
+            # Partial selection instead of sorting every trial to keep the first 10%
+            successful_trials = heapq.nsmallest(top_10_percent, valued_trials, key=lambda t: t.value)
             logger.info(f"Using top {len(successful_trials)} trials for distributions")
         
         # Get best trial
@@ -161,12 +177,6 @@ class TargetDrivenCascadeOptimizer:
         # Calculate optimization time
         optimization_time = time.time() - start_time
         
-        # Calculate worst distance from all trials
-        worst_distance = max(
-            (trial.value for trial in study.trials if trial.value is not None),
-            default=float('inf')
-        )
-        
         # Create result
         result = TargetOptimizationResult(
             target_achieved=len(successful_trials) > 0,
@@ -180,8 +190,8 @@ class TargetDrivenCascadeOptimizer:
             mv_distributions=mv_distributions,
             cv_distributions=cv_distributions,
             successful_trials=len(successful_trials),
-            total_trials=len(study.trials),
-            success_rate=len(successful_trials) / len(study.trials) if study.trials else 0.0,
+            total_trials=len(all_trials),
+            success_rate=len(successful_trials) / len(all_trials) if all_trials else 0.0,
             confidence_level=request.confidence_level,
             optimization_time=optimization_time
         )
@@ -194,13 +204,17 @@ class TargetDrivenCascadeOptimizer:
         return result
     
     def _target_seeking_objective(self, trial: optuna.trial.Trial, 
-                                 request: TargetOptimizationRequest) -> float:
+                                 request: TargetOptimizationRequest,
+                                 mv_spec: List[Tuple[str, str, float, float, Optional[float]]],
+                                 predict: Callable[[Dict[str, float]], Dict[str, Any]]) -> float:
         """
         Objective function that seeks a specific target value
         
         Args:
             trial: Optuna trial object
             request: Target optimization request
+            mv_spec: (param name, MV id, min, max, step) per sampled MV
+            predict: Cascade predictor for this run, see cached_cascade_predictor()
             
         Returns:
             Distance from target + constraint penalties
@@ -208,11 +222,11 @@ class TargetDrivenCascadeOptimizer:
         try:
             # Sample MV values within bounds
             mv_values = {}
-            for mv_name, (min_val, max_val) in request.mv_bounds.items():
-                mv_values[mv_name] = trial.suggest_float(f"mv_{mv_name}", min_val, max_val)
+            for param_name, mv_name, min_val, max_val, step in mv_spec:
+                mv_values[mv_name] = trial.suggest_float(param_name, min_val, max_val, step=step)
             
             # Predict cascade: MVs → CVs → Target
-            prediction = self.model_manager.predict_cascade(mv_values, request.dv_values)
+            prediction = predict(mv_values)
             
             # Get predicted target value
             predicted_target = prediction['predicted_target']
@@ -245,9 +259,9 @@ class TargetDrivenCascadeOptimizer:
         Returns:
             Penalty value (0 if no violations)
         """
-        penalty = 0.0
         penalty_factor = 1000.0  # Large penalty for constraint violations
         
+        penalty = 0.0
         for cv_name, cv_value in predicted_cvs.items():
             if cv_name in cv_bounds:
                 min_val, max_val = cv_bounds[cv_name]
@@ -277,22 +291,17 @@ class TargetDrivenCascadeOptimizer:
         if not successful_trials:
             return mv_distributions
         
-        # Get all MV parameter names
-        mv_params = set()
-        for trial in successful_trials:
-            mv_params.update([k for k in trial.params.keys() if k.startswith('mv_')])
+        # Every trial suggests all MVs, so the parameter set is the same across trials
+        mv_params = [k for k in successful_trials[0].params.keys() if k.startswith('mv_')]
         
-        # Calculate distributions for each MV
-        for mv_param in mv_params:
-            mv_name = mv_param.replace('mv_', '')
-            values = [trial.params[mv_param] for trial in successful_trials if mv_param in trial.params]
-            
-            if values:
-                mv_distributions[mv_name] = self._calculate_distribution_stats(
-                    values, confidence_level
-                )
+        # Stack into a (n_trials, n_mvs) matrix and reduce all MVs at once
+        mv_matrix = np.array(
+            [[trial.params[mv_param] for mv_param in mv_params] for trial in successful_trials],
+            dtype=np.float64
+        )
+        mv_names = [mv_param.replace('mv_', '') for mv_param in mv_params]
         
-        return mv_distributions
+        return self._calculate_distribution_stats(mv_matrix, mv_names, confidence_level)
     
     def _extract_cv_distributions(self, successful_trials: List[optuna.trial.FrozenTrial],
                                  request: TargetOptimizationRequest,
@@ -313,75 +322,86 @@ class TargetDrivenCascadeOptimizer:
         if not successful_trials:
             return cv_distributions
         
-        # Predict CVs for all successful MV combinations
-        cv_predictions = {}
+        # Stack the MV values of all successful trials into one (n_trials, n_mvs)
+        # matrix and predict the CVs in a single batched call
+        mv_order = list(request.mv_bounds.keys())
+        mv_matrix = np.array(
+            [[trial.params[f"mv_{mv_name}"] for mv_name in mv_order] for trial in successful_trials],
+            dtype=np.float64
+        )
+        # The request's fixed DVs, repeated for every trial as in the optimization itself
+        dv_order = list(request.dv_values.keys())
+        dv_matrix = np.tile(
+            np.array([request.dv_values[dv_name] for dv_name in dv_order], dtype=np.float64),
+            (len(successful_trials), 1)
+        )
+        
+        try:
+            prediction = self.model_manager.predict_cascade_array(mv_matrix, dv_matrix, mv_order, dv_order)
+        except Exception as e:
+            logger.warning(f"Failed to predict CVs for successful trials: {e}")
+            return cv_distributions
         
-        for trial in successful_trials:
-            # Extract MV values from trial
-            mv_values = {k.replace('mv_', ''): v for k, v in trial.params.items() if k.startswith('mv_')}
-            
-            try:
-                # Predict CVs using cascade model
-                prediction = self.model_manager.predict_cascade(mv_values, request.dv_values)
-                predicted_cvs = prediction['predicted_cvs']
-                
-                # Collect CV predictions
-                for cv_name, cv_value in predicted_cvs.items():
-                    if cv_name not in cv_predictions:
-                        cv_predictions[cv_name] = []
-                    cv_predictions[cv_name].append(cv_value)
-                    
-            except Exception as e:
-                logger.warning(f"Failed to predict CVs for trial {trial.number}: {e}")
-                continue
-        
-        # Calculate distributions for each CV
-        for cv_name, values in cv_predictions.items():
-            if values:
-                cv_distributions[cv_name] = self._calculate_distribution_stats(
-                    values, confidence_level
-                )
-        
-        return cv_distributions
+        # Calculate distributions for all CVs over the (n_trials, n_cvs) prediction matrix
+        return self._calculate_distribution_stats(
+            prediction['cv_matrix'], prediction['cv_order'], confidence_level
+        )
     
-    def _calculate_distribution_stats(self, values: List[float], 
-                                    confidence_level: float) -> ParameterDistribution:
+    def _calculate_distribution_stats(self, values: np.ndarray, names: List[str],
+                                    confidence_level: float) -> Dict[str, ParameterDistribution]:
         """
-        Calculate statistical distribution from parameter values
+        Calculate statistical distributions for several parameters at once
         
         Args:
-            values: List of parameter values
+            values: Parameter values, shape (n_samples, n_parameters)
+            names: Parameter names matching the columns of values
             confidence_level: Confidence level for percentiles
             
         Returns:
-            ParameterDistribution with statistics
+            Dictionary of ParameterDistribution per parameter name
         """
-        values_array = np.array(values)
+        values_array = np.asarray(values, dtype=np.float64)
+        if values_array.size == 0:
+            return {}
         
         # Calculate percentiles for confidence intervals
         alpha = 1 - confidence_level
         lower_percentile = (alpha / 2) * 100
         upper_percentile = (1 - alpha / 2) * 100
         
-        percentiles = {
-            5: float(np.percentile(values_array, 5)),
-            25: float(np.percentile(values_array, 25)),
-            50: float(np.percentile(values_array, 50)),  # median
-            75: float(np.percentile(values_array, 75)),
-            95: float(np.percentile(values_array, 95)),
-            f"{lower_percentile:.1f}": float(np.percentile(values_array, lower_percentile)),
-            f"{upper_percentile:.1f}": float(np.percentile(values_array, upper_percentile))
+        # Sort each column once; percentiles, median, min and max are then
+        # read off the sorted columns with numpy's default linear interpolation
+        sorted_values = np.sort(values_array, axis=0)
+        n_samples = sorted_values.shape[0]
+        
+        def percentile(q: float) -> np.ndarray:
+            position = q / 100 * (n_samples - 1)
+            below = int(position)
+            above = min(below + 1, n_samples - 1)
+            return sorted_values[below] + (sorted_values[above] - sorted_values[below]) * (position - below)
+        
+        percentile_keys = [5, 25, 50, 75, 95, f"{lower_percentile:.1f}", f"{upper_percentile:.1f}"]
+        percentile_values = np.stack([
+            percentile(q) for q in (5, 25, 50, 75, 95, lower_percentile, upper_percentile)
+        ])
+        means = values_array.mean(axis=0)
+        stds = values_array.std(axis=0)
+        medians = percentile_values[2]
+        mins = sorted_values[0]
+        maxs = sorted_values[-1]
+        
+        return {
+            name: ParameterDistribution(
+                mean=float(means[j]),
+                std=float(stds[j]),
+                median=float(medians[j]),
+                percentiles={key: float(percentile_values[k, j]) for k, key in enumerate(percentile_keys)},
+                min_value=float(mins[j]),
+                max_value=float(maxs[j]),
+                sample_count=values_array.shape[0]
+            )
+            for j, name in enumerate(names)
         }
-        
-        return ParameterDistribution(
-            mean=float(np.mean(values_array)),
-            std=float(np.std(values_array)),
-            median=float(np.median(values_array)),
-            percentiles=percentiles,
-            min_value=float(np.min(values_array)),
-            max_value=float(np.max(values_array)),
-            sample_count=len(values)
-        )
 
 # Convenience functions for easy usage
 def optimize_for_target(model_manager: CascadeModelManager,
@@ -0,0 +1,211 @@
+"""
+Test script for the XGBoost cascade fast paths
+
+Trains an in-memory cascade on synthetic data and checks the batched prediction
+paths (predict_cascade_batch, predict_cascade_array), the optimizer's cached
+predictor and MV sampling spec, and the batched chain validation against the
+baseline per-sample predict_cascade().
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimization_cascade.cascade_models import CascadeModelManager
+from optimization_cascade.simple_cascade_optimizer import cached_cascade_predictor, mv_sampling_spec
+
+
+MVS = ["Ore", "WaterMill", "WaterZumpf", "MotorAmp"]
+CVS = ["PulpHC", "DensityHC", "PressureHC"]
+DVS = ["Shisti"]
+
+
+def make_training_data(n_rows=400, seed=0):
+    """Synthetic mill data with CVs inside the classifier constraints most of the time"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Ore": rng.uniform(150.0, 230.0, n_rows),
+        "WaterMill": rng.uniform(8.0, 22.0, n_rows),
+        "WaterZumpf": rng.uniform(150.0, 240.0, n_rows),
+        "MotorAmp": rng.uniform(160.0, 240.0, n_rows),
+        "Shisti": rng.uniform(0.0, 40.0, n_rows)
+    })
+    df["PulpHC"] = 250.0 + 0.8 * df["Ore"] + 0.6 * df["WaterZumpf"] + rng.normal(0.0, 5.0, n_rows)
+    df["DensityHC"] = 1300.0 + 2.0 * df["Ore"] - 8.0 * df["WaterMill"] + rng.normal(0.0, 10.0, n_rows)
+    df["PressureHC"] = 0.1 + 0.001 * df["WaterZumpf"] + 0.0005 * df["MotorAmp"] + rng.normal(0.0, 0.01, n_rows)
+    df["PSI200"] = (10.0 + 0.05 * df["Ore"] - 0.02 * (df["PulpHC"] - 500.0)
+                    + 0.005 * (df["DensityHC"] - 1600.0) + 0.1 * df["Shisti"] + rng.normal(0.0, 0.5, n_rows))
+    return df
+
+
+def train_manager(df):
+    """In-memory manager (no disk IO) trained on the synthetic data"""
+    manager = CascadeModelManager(None)
+    manager.configure_features(mv_features=MVS, cv_features=CVS, dv_features=DVS, target_variable="PSI200")
+    manager.train_all_models(df, include_feature_importance=False)
+    return manager
+
+
+def test_batch_matches_predict_cascade(manager, df):
+    """predict_cascade_batch and predict_cascade_array equal per-row predict_cascade"""
+    print("\n" + "="*80)
+    print("TEST 1: Batched cascade vs predict_cascade")
+    print("="*80)
+
+    sample = df.iloc[:50]
+    mv_matrix = sample[MVS].to_numpy(dtype=np.float64)
+    shisti = sample["Shisti"].to_numpy(dtype=np.float64)
+
+    expected = [manager.predict_cascade(dict(zip(MVS, row.tolist())), {"Shisti": float(dv)})
+                for row, dv in zip(mv_matrix, shisti)]
+    expected_target = np.array([result['predicted_target'] for result in expected])
+    expected_feasible = np.array([result['is_feasible'] for result in expected])
+    print(f"  Feasible samples: {int(expected_feasible.sum())}/{len(expected)}")
+    assert expected_feasible.any(), "synthetic data must produce feasible samples"
+
+    batch = manager.predict_cascade_batch(mv_matrix, {"Shisti": shisti})
+    assert np.array_equal(batch['is_feasible'], expected_feasible)
+    assert np.allclose(batch['predicted_target'], expected_target, rtol=1e-6, atol=1e-6)
+    for cv_id in CVS:
+        expected_cv = np.array([result['predicted_cvs'][cv_id] for result in expected])
+        assert np.allclose(batch['predicted_cvs'][cv_id], expected_cv, rtol=1e-6, atol=1e-6), cv_id
+        assert np.array_equal(batch['cv_matrix'][:, batch['cv_order'].index(cv_id)], batch['predicted_cvs'][cv_id])
+
+    # Caller-defined column order is mapped onto the model's MV order
+    mv_order = list(reversed(MVS))
+    array_result = manager.predict_cascade_array(sample[mv_order].to_numpy(), shisti[:, None], mv_order, DVS)
+    assert np.array_equal(array_result['predicted_target'], batch['predicted_target'])
+
+    try:
+        manager.predict_cascade_array(sample[MVS[1:]].to_numpy(), None, MVS[1:])
+    except ValueError as e:
+        print(f"  Missing MV rejected: {e}")
+    else:
+        raise AssertionError("a matrix without all model MVs must be rejected")
+
+    print("✅ Batched predictions match predict_cascade")
+
+
+def test_cached_predictor(manager):
+    """The memoized predictor returns predict_cascade results and hands out independent copies"""
+    print("\n" + "="*80)
+    print("TEST 2: cached_cascade_predictor")
+    print("="*80)
+
+    mv_bounds = {"Ore": (150.0, 230.0), "WaterMill": (8.0, 22.0), "WaterZumpf": (150.0, 240.0), "MotorAmp": (160.0, 240.0)}
+    spec = mv_sampling_spec(mv_bounds, {mv_id: 0.1 for mv_id in MVS})
+    dv_values = {"Shisti": 12.0}
+    predict = cached_cascade_predictor(manager, dv_values, spec)
+
+    mv_values = {"Ore": 190.0, "WaterMill": 15.0, "WaterZumpf": 200.0, "MotorAmp": 200.0}
+    expected = manager.predict_cascade(mv_values, dv_values)
+    first = predict(mv_values)
+    assert first['predicted_target'] == expected['predicted_target']
+    assert first['predicted_cvs'] == expected['predicted_cvs']
+    assert first['is_feasible'] == expected['is_feasible']
+
+    # Callers may mutate their result without corrupting later cache hits
+    first['predicted_cvs']['PulpHC'] = -1.0
+    first['constraint_violations'].append({'variable': 'PulpHC'})
+    second = predict(dict(mv_values))
+    assert second['predicted_cvs'] == expected['predicted_cvs']
+    assert second['constraint_violations'] == expected['constraint_violations']
+
+    # A different point is not served from the cache
+    other = dict(mv_values, Ore=191.0)
+    assert predict(other)['predicted_cvs'] == manager.predict_cascade(other, dv_values)['predicted_cvs']
+
+    print("✅ Cached predictor matches predict_cascade and returns copies")
+
+
+def test_mv_sampling_spec():
+    """Stepped bounds move inward onto the step grid; MVs without a grid point stay continuous"""
+    print("\n" + "="*80)
+    print("TEST 3: mv_sampling_spec")
+    print("="*80)
+
+    spec = mv_sampling_spec(
+        {"Ore": (140.05, 239.97), "WaterMill": (5.0, 25.0), "WaterZumpf": (140.01, 140.09), "MotorAmp": (150.0, 250.0)},
+        {"Ore": 0.1, "WaterMill": 0.1, "WaterZumpf": 0.1}
+    )
+    by_id = {mv_name: (param, lo, hi, step) for param, mv_name, lo, hi, step in spec}
+    print(f"  Spec: {spec}")
+
+    assert by_id["Ore"] == ("mv_Ore", 140.1, 239.9, 0.1), "bounds off the grid move inward"
+    assert by_id["WaterMill"] == ("mv_WaterMill", 5.0, 25.0, 0.1), "bounds on the grid are kept"
+    assert by_id["WaterZumpf"] == ("mv_WaterZumpf", 140.01, 140.09, None), "no grid point -> continuous"
+    assert by_id["MotorAmp"] == ("mv_MotorAmp", 150.0, 250.0, None), "MVs without a step are continuous"
+    for _, _, lo, hi, step in spec:
+        if step:
+            n_steps = (hi - lo) / step
+            assert abs(n_steps - round(n_steps)) < 1e-6, "range must be a multiple of the step"
+
+    print("✅ Sampling spec aligns stepped bounds")
+
+
+def test_validate_complete_chain(manager, df):
+    """Batched chain validation equals per-row predictions and skips rows with missing values"""
+    print("\n" + "="*80)
+    print("TEST 4: validate_complete_chain")
+    print("="*80)
+
+    sample = df.iloc[:60].copy()
+    sample.iloc[3, sample.columns.get_loc("Ore")] = np.nan
+    sample.iloc[7, sample.columns.get_loc("PSI200")] = np.inf
+
+    np.random.seed(0)
+    results = manager.validate_complete_chain(sample, n_samples=len(sample))
+    assert results['n_requested'] == len(sample)
+    assert results['n_samples'] == len(sample) - 2, "rows with non-finite inputs or target must be skipped"
+    assert isinstance(results['predictions'], list) and isinstance(results['actuals'], list)
+    assert len(results['predictions']) == results['n_samples'] == len(results['actuals'])
+    assert set(results['cv_accuracy']) == set(CVS)
+
+    # Same predictions as the per-row baseline, in the sampled order
+    np.random.seed(0)
+    test_data = sample.iloc[np.random.choice(len(sample), len(sample), replace=False)]
+    test_data = test_data[np.isfinite(test_data[MVS + DVS + ["PSI200"]]).all(axis=1)]
+    expected = [manager.predict_cascade(dict(zip(MVS, row[MVS].tolist())), {"Shisti": float(row["Shisti"])})['predicted_target']
+                for _, row in test_data.iterrows()]
+    assert np.allclose(results['predictions'], expected, rtol=1e-6, atol=1e-6)
+    assert np.array_equal(results['actuals'], test_data["PSI200"].to_numpy())
+
+    np.random.seed(0)
+    aggregate = manager.validate_complete_chain(sample, n_samples=len(sample), store_pointwise=False)
+    assert aggregate['predictions'] == [] and aggregate['actuals'] == []
+    assert aggregate['r2_score'] == results['r2_score']
+
+    print("✅ Chain validation matches per-row predictions")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*80)
+    print("CASCADE FAST PATH TESTS")
+    print("="*80)
+
+    try:
+        df = make_training_data()
+        manager = train_manager(df)
+        test_batch_matches_predict_cascade(manager, df)
+        test_cached_predictor(manager)
+        test_mv_sampling_spec()
+        test_validate_complete_chain(manager, df)
+
+        print("\n" + "="*80)
+        print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+        print("="*80)
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
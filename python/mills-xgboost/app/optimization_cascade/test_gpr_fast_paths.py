@@ -0,0 +1,346 @@
+"""
+Test script for the GPR cascade fast paths
+
+Builds a small mill_gp_XX directory from GPR models fitted on synthetic data and
+checks the optimized prediction paths (kernel groups, predict_cascade_batch,
+predict_cascade_fast, the prediction batcher) against a reference computed with
+plain scaler.transform() + gp.predict(return_std=True) per model. Also covers the
+model registry, the directory listing cache and the optimizer's warm start.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import ConstantKernel, RBF, Matern, WhiteKernel
+from sklearn.preprocessing import StandardScaler
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimization_cascade import gpr_cascade_optimizer
+from optimization_cascade.gpr_cascade_models import (
+    GPRCascadeModelManager, GPRPredictionBatcher, _list_pkl_files_cached
+)
+from optimization_cascade.gpr_cascade_optimizer import GPRCascadeOptimizer, GPROptimizationRequest
+
+
+MILL_NUMBER = 1
+MVS = ["Ore", "WaterMill"]
+CVS = ["PulpHC", "DensityHC", "PressureHC"]
+DVS = ["Shisti"]
+QUALITY_FEATURES = CVS + DVS
+
+
+def _cv_values(X):
+    """Synthetic process response: CVs as smooth functions of (Ore, WaterMill)"""
+    ore, water = X[:, 0], X[:, 1]
+    return {
+        "PulpHC": 2.0 * ore + 5.0 * water + 3.0 * np.sin(ore / 10.0),
+        "DensityHC": 1500.0 + 1.5 * ore - 10.0 * water,
+        "PressureHC": 0.001 * ore + 0.01 * water + 0.02 * np.cos(water)
+    }
+
+
+def _fit_gp(kernel, X, y):
+    """GP with fixed hyperparameters, so models with the same kernel end up with equal kernel_"""
+    gp = GaussianProcessRegressor(kernel=kernel, optimizer=None, normalize_y=True)
+    return gp.fit(X, y)
+
+
+def _dump(obj, path):
+    with open(path, 'wb') as f:
+        pickle.dump(obj, f)
+
+
+def build_model_dir(base_path):
+    """Write a complete mill_gp_XX cascade (metadata, process and quality models) under base_path"""
+    rng = np.random.default_rng(0)
+    model_dir = os.path.join(base_path, f"mill_gp_{MILL_NUMBER:02d}")
+    os.makedirs(model_dir, exist_ok=True)
+
+    X_train = np.column_stack([rng.uniform(160.0, 220.0, 40), rng.uniform(10.0, 20.0, 40)])
+    mv_scaler = StandardScaler().fit(X_train)
+    X_scaled = mv_scaler.transform(X_train)
+    cv_train = _cv_values(X_train)
+
+    # PulpHC and DensityHC share kernel and training inputs -> one kernel group;
+    # PressureHC (Matern) takes the per-model gp.predict path
+    rbf_kernel = ConstantKernel(2.0, "fixed") * RBF([1.0, 1.5], "fixed") + WhiteKernel(1e-2, "fixed")
+    kernels = {
+        "PulpHC": rbf_kernel,
+        "DensityHC": rbf_kernel,
+        "PressureHC": Matern(length_scale=1.0, length_scale_bounds="fixed", nu=2.5) + WhiteKernel(1e-3, "fixed")
+    }
+    for cv_id in CVS:
+        _dump(_fit_gp(kernels[cv_id], X_scaled, cv_train[cv_id]), os.path.join(model_dir, f"process_model_{cv_id}.pkl"))
+        _dump(mv_scaler, os.path.join(model_dir, f"process_model_{cv_id}_scaler.pkl"))
+
+    shisti = rng.uniform(0.0, 30.0, 40)
+    Q_train = np.column_stack([cv_train[cv_id] for cv_id in CVS] + [shisti])
+    target = 20.0 + 0.02 * cv_train["PulpHC"] - 0.005 * cv_train["DensityHC"] + 0.1 * shisti
+    quality_scaler = StandardScaler().fit(Q_train)
+    quality_kernel = ConstantKernel(1.0, "fixed") * RBF(2.0, "fixed") + WhiteKernel(1e-2, "fixed")
+    _dump(_fit_gp(quality_kernel, quality_scaler.transform(Q_train), target), os.path.join(model_dir, "quality_model.pkl"))
+    _dump(quality_scaler, os.path.join(model_dir, "quality_model_scaler.pkl"))
+
+    metadata = {
+        "mill_number": MILL_NUMBER,
+        "model_type": "Gaussian Process Regression",
+        "features": {"mv_features": MVS, "cv_features": CVS, "dv_features": DVS, "target_variable": "PSI200"},
+        "model_performance": {"quality_model": {"input_features": QUALITY_FEATURES}}
+    }
+    with open(os.path.join(model_dir, "metadata.json"), 'w') as f:
+        json.dump(metadata, f)
+    return model_dir
+
+
+def reference_cascade(model_dir, mv_matrix, shisti):
+    """Baseline cascade: per-model scaler.transform() + gp.predict(return_std=True)"""
+    def load(name):
+        with open(os.path.join(model_dir, f"{name}.pkl"), 'rb') as f:
+            return pickle.load(f)
+
+    cv_means, cv_stds = {}, {}
+    for cv_id in CVS:
+        gp, scaler = load(f"process_model_{cv_id}"), load(f"process_model_{cv_id}_scaler")
+        cv_means[cv_id], cv_stds[cv_id] = gp.predict(scaler.transform(mv_matrix), return_std=True)
+
+    quality_matrix = np.column_stack([cv_means[cv_id] for cv_id in CVS] + [np.broadcast_to(shisti, len(mv_matrix))])
+    gp, scaler = load("quality_model"), load("quality_model_scaler")
+    target, target_std = gp.predict(scaler.transform(quality_matrix), return_std=True)
+    return cv_means, cv_stds, target, target_std
+
+
+def _test_points():
+    rng = np.random.default_rng(1)
+    return np.column_stack([rng.uniform(165.0, 215.0, 25), rng.uniform(11.0, 19.0, 25)])
+
+
+def test_batch_matches_reference(base_path, model_dir):
+    """predict_cascade_batch (kernel groups + shared scaler) equals the per-model baseline"""
+    print("\n" + "="*80)
+    print("TEST 1: predict_cascade_batch vs gp.predict(return_std=True)")
+    print("="*80)
+
+    manager = GPRCascadeModelManager(base_path, mill_number=MILL_NUMBER)
+    assert manager.load_models()
+    assert manager._shared_mv_scaler is not None, "identical process scalers must be detected as shared"
+    grouped = [group['cv_ids'] for group in manager._kernel_groups]
+    print(f"  Kernel groups: {grouped}")
+    assert ["PulpHC", "DensityHC"] in grouped, "models with equal kernel and X_train must form one group"
+    assert all("PressureHC" not in cv_ids for cv_ids in grouped), "a single Matern model gets no group"
+
+    X = _test_points()
+    cv_means, cv_stds, target, target_std = reference_cascade(model_dir, X, 12.0)
+
+    for return_uncertainty in (False, True):
+        out = manager.predict_cascade_batch(X, {"Shisti": 12.0}, return_uncertainty=return_uncertainty)
+        assert list(out['predicted_cvs']) == CVS, "CV order must follow the metadata"
+        for cv_id in CVS:
+            assert np.allclose(out['predicted_cvs'][cv_id], cv_means[cv_id], rtol=1e-9, atol=1e-9), cv_id
+        assert np.allclose(out['predicted_target'], target, rtol=1e-9, atol=1e-9)
+        if return_uncertainty:
+            for cv_id in CVS:
+                assert np.allclose(out['cv_uncertainties'][cv_id], cv_stds[cv_id], rtol=1e-6, atol=1e-9), cv_id
+            assert np.allclose(out['target_uncertainty'], target_std, rtol=1e-6, atol=1e-9)
+
+    # Per-sample DV arrays
+    shisti = np.linspace(0.0, 30.0, len(X))
+    _, _, target, _ = reference_cascade(model_dir, X, shisti)
+    out = manager.predict_cascade_batch(X, {"Shisti": shisti})
+    assert np.allclose(out['predicted_target'], target, rtol=1e-9, atol=1e-9)
+
+    print("✅ Batched predictions match the baseline (means and stds)")
+    return manager
+
+
+def test_single_sample_paths(manager, model_dir):
+    """predict_cascade and predict_cascade_fast agree with the baseline for every sample"""
+    print("\n" + "="*80)
+    print("TEST 2: predict_cascade / predict_cascade_fast vs baseline")
+    print("="*80)
+
+    X = _test_points()
+    cv_means, cv_stds, target, target_std = reference_cascade(model_dir, X, 12.0)
+
+    for i, row in enumerate(X):
+        mv_values = dict(zip(MVS, row.tolist()))
+        result = manager.predict_cascade(mv_values, {"Shisti": 12.0}, return_uncertainty=True)
+        for cv_id in CVS:
+            assert np.isclose(result['predicted_cvs'][cv_id], cv_means[cv_id][i], rtol=1e-9, atol=1e-9)
+            assert np.isclose(result['cv_uncertainties'][cv_id], cv_stds[cv_id][i], rtol=1e-6, atol=1e-9)
+        assert np.isclose(result['predicted_target'], target[i], rtol=1e-9, atol=1e-9)
+        assert np.isclose(result['target_uncertainty'], target_std[i], rtol=1e-6, atol=1e-9)
+
+        fast_target, fast_std, cv_vec = manager.predict_cascade_fast(mv_values, {"Shisti": 12.0}, return_uncertainty=True)
+        assert np.isclose(fast_target, target[i], rtol=1e-9, atol=1e-9)
+        assert np.isclose(fast_std, target_std[i], rtol=1e-6, atol=1e-9)
+        assert np.allclose(cv_vec, [cv_means[cv_id][i] for cv_id in manager.cv_names], rtol=1e-9, atol=1e-9)
+
+        fast_target, fast_std, _ = manager.predict_cascade_fast(mv_values, {"Shisti": 12.0})
+        assert fast_std is None and np.isclose(fast_target, target[i], rtol=1e-9, atol=1e-9)
+
+    # A missing DV takes the fallback path (zero) in both single-sample paths
+    mv_values = dict(zip(MVS, X[0].tolist()))
+    _, _, target, _ = reference_cascade(model_dir, X[:1], 0.0)
+    assert np.isclose(manager.predict_cascade(mv_values, {})['predicted_target'], target[0], rtol=1e-9, atol=1e-9)
+    assert np.isclose(manager.predict_cascade_fast(mv_values, {})[0], target[0], rtol=1e-9, atol=1e-9)
+
+    print("✅ Single-sample paths match the baseline")
+
+
+def test_prediction_batcher(manager):
+    """Coalesced predictions equal predict_cascade; a bad request fails only itself"""
+    print("\n" + "="*80)
+    print("TEST 3: GPRPredictionBatcher")
+    print("="*80)
+
+    X = _test_points()[:10]
+    batcher = GPRPredictionBatcher(manager, max_batch_size=16, max_queue_time=0.05)
+
+    async def run():
+        requests = [(dict(zip(MVS, row.tolist())), {"Shisti": 5.0 + i}, i % 2 == 0) for i, row in enumerate(X)]
+        results = await asyncio.gather(*(batcher.predict(*request) for request in requests))
+
+        # One unparseable DV in the batch: its own request raises, the others still resolve
+        bad = batcher.predict(dict(zip(MVS, X[0].tolist())), {"Shisti": "bad"})
+        good = batcher.predict(dict(zip(MVS, X[1].tolist())), {"Shisti": 5.0})
+        mixed = await asyncio.gather(bad, good, return_exceptions=True)
+        batcher.close()
+        return requests, results, mixed
+
+    requests, results, mixed = asyncio.run(run())
+
+    for (mv_values, dv_values, return_uncertainty), result in zip(requests, results):
+        expected = manager.predict_cascade(mv_values, dv_values, return_uncertainty)
+        assert np.isclose(result['predicted_target'], expected['predicted_target'], rtol=1e-9, atol=1e-9)
+        for cv_id in CVS:
+            assert np.isclose(result['predicted_cvs'][cv_id], expected['predicted_cvs'][cv_id], rtol=1e-9, atol=1e-9)
+        assert ('target_uncertainty' in result) == return_uncertainty
+        if return_uncertainty:
+            assert np.isclose(result['target_uncertainty'], expected['target_uncertainty'], rtol=1e-6, atol=1e-9)
+
+    assert isinstance(mixed[0], Exception), "the request with a bad DV must fail"
+    expected = manager.predict_cascade(dict(zip(MVS, X[1].tolist())), {"Shisti": 5.0})
+    assert np.isclose(mixed[1]['predicted_target'], expected['predicted_target'], rtol=1e-9, atol=1e-9)
+
+    print("✅ Batcher results match predict_cascade and failures stay isolated")
+
+
+def test_model_registry(base_path, model_dir):
+    """get_or_load reuses managers until the model files change; listings are returned as copies"""
+    print("\n" + "="*80)
+    print("TEST 4: Model registry and directory cache")
+    print("="*80)
+
+    GPRCascadeModelManager.invalidate()
+    first = GPRCascadeModelManager.get_or_load(base_path, MILL_NUMBER)
+    assert first is not None
+    assert GPRCascadeModelManager.get_or_load(base_path, MILL_NUMBER) is first, "unchanged files must reuse the manager"
+
+    # Retraining rewrites metadata.json -> the next lookup reloads
+    metadata_path = os.path.join(model_dir, "metadata.json")
+    mtime_ns = os.stat(metadata_path).st_mtime_ns + 2_000_000_000
+    os.utime(metadata_path, ns=(mtime_ns, mtime_ns))
+    second = GPRCascadeModelManager.get_or_load(base_path, MILL_NUMBER)
+    assert second is not None and second is not first, "changed model files must be reloaded"
+
+    GPRCascadeModelManager.invalidate(MILL_NUMBER, base_path)
+    assert GPRCascadeModelManager.get_or_load(base_path, MILL_NUMBER) is not second, "invalidate() must drop the entry"
+
+    assert GPRCascadeModelManager.get_or_load(base_path, MILL_NUMBER + 1) is None, "missing mills load as None"
+
+    listing = _list_pkl_files_cached(model_dir)
+    assert len(listing) == 2 * len(CVS) + 2
+    listing.clear()
+    assert len(_list_pkl_files_cached(model_dir)) == 2 * len(CVS) + 2, "mutating a listing must not alter the cache"
+
+    print("✅ Registry reloads on change and the listing cache hands out copies")
+
+
+def test_warm_start(base_path, model_dir):
+    """A warm-started run stores its optimum; seeds are dropped once the models change"""
+    print("\n" + "="*80)
+    print("TEST 5: Optimizer warm start")
+    print("="*80)
+
+    warm_start_dir = tempfile.mkdtemp(prefix="gpr_warm_start_test_")
+    original_dir = gpr_cascade_optimizer.WARM_START_DIR
+    gpr_cascade_optimizer.WARM_START_DIR = warm_start_dir
+    try:
+        manager = GPRCascadeModelManager(base_path, mill_number=MILL_NUMBER)
+        assert manager.load_models()
+        optimizer = GPRCascadeOptimizer(manager)
+        def make_request(mv_bounds):
+            return GPROptimizationRequest(
+                mv_bounds=mv_bounds,
+                cv_bounds={"PulpHC": (0.0, 2000.0), "DensityHC": (0.0, 5000.0), "PressureHC": (-10.0, 10.0)},
+                dv_values={"Shisti": 12.0},
+                n_trials=20,
+                warm_start=True
+            )
+        request = make_request({"Ore": (165.0, 215.0), "WaterMill": (11.0, 19.0)})
+
+        assert optimizer._load_warm_start(request) == [], "no seeds before the first run"
+        first = optimizer.optimize(request)
+        seeds = optimizer._load_warm_start(request)
+        print(f"  Stored seeds: {seeds}")
+        assert seeds and seeds[0] == first.best_mv_values, "the run's optimum must be stored as a seed"
+
+        # Seeds outside the request's MV bounds are not used
+        narrow = make_request({"Ore": (165.0, 165.5), "WaterMill": (11.0, 11.5)})
+        assert all(165.0 <= seed["Ore"] <= 165.5 for seed in optimizer._load_warm_start(narrow))
+
+        second = optimizer.optimize(request)
+        better_or_equal = second.best_target_value <= first.best_target_value + 1e-9
+        assert better_or_equal, "a warm-started run re-evaluates the stored optimum first"
+
+        # Retrained models invalidate the stored optima
+        metadata_path = os.path.join(model_dir, "metadata.json")
+        mtime_ns = os.stat(metadata_path).st_mtime_ns + 2_000_000_000
+        os.utime(metadata_path, ns=(mtime_ns, mtime_ns))
+        assert optimizer._load_warm_start(request) == [], "seeds of previously trained models must be ignored"
+    finally:
+        gpr_cascade_optimizer.WARM_START_DIR = original_dir
+        shutil.rmtree(warm_start_dir, ignore_errors=True)
+
+    print("✅ Warm start stores, reuses and invalidates optima")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*80)
+    print("GPR CASCADE FAST PATH TESTS")
+    print("="*80)
+
+    base_path = tempfile.mkdtemp(prefix="gpr_fast_paths_")
+    try:
+        model_dir = build_model_dir(base_path)
+        manager = test_batch_matches_reference(base_path, model_dir)
+        test_single_sample_paths(manager, model_dir)
+        test_prediction_batcher(manager)
+        test_model_registry(base_path, model_dir)
+        test_warm_start(base_path, model_dir)
+
+        print("\n" + "="*80)
+        print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+        print("="*80)
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        GPRCascadeModelManager.invalidate(base_path=base_path)
+        shutil.rmtree(base_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Test script for the GPR optimizer's objective direction
+
+Checks that maximize=True requests steer the study towards higher targets
+(and minimize=False towards lower ones) using a stand-in model manager with
+a known response surface, so no trained models are needed.
+"""
+
+import sys
+import os
+
+import numpy as np
+import optuna
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimization_cascade._numba_utils import compute_objectives
+from optimization_cascade.gpr_cascade_optimizer import GPRCascadeOptimizer, GPROptimizationRequest
+
+
+class LinearCascadeManager:
+    """Stand-in for GPRCascadeModelManager: target = MV, one CV equal to the MV"""
+    mv_order = ["Ore"]
+    mill_number = None
+    model_save_path = None
+
+    def predict_cascade_batch(self, mv_matrix, dv_values=None, return_uncertainty=False):
+        target = np.asarray(mv_matrix, dtype=np.float64)[:, 0].copy()
+        return {
+            'predicted_cvs': {'PulpHC': target.copy()},
+            'predicted_target': target,
+            'target_uncertainty': np.zeros_like(target) if return_uncertainty else None,
+            'is_feasible': np.ones(len(target), dtype=bool)
+        }
+
+    def predict_cascade_fast(self, mv_values, dv_values=None, return_uncertainty=False):
+        target = float(mv_values["Ore"])
+        return target, 0.0 if return_uncertainty else None, {'PulpHC': target}
+
+
+def _request(maximize):
+    return GPROptimizationRequest(
+        mv_bounds={"Ore": (100.0, 200.0)},
+        cv_bounds={"PulpHC": (0.0, 1000.0)},
+        dv_values={},
+        maximize=maximize,
+        n_trials=40
+    )
+
+
+def test_compute_objectives_direction():
+    """The best objective in the study's direction is the best target"""
+    print("\n" + "="*80)
+    print("TEST 1: compute_objectives direction")
+    print("="*80)
+
+    means = np.array([1.0, 3.0, 2.0])
+    stds = np.zeros(3)
+    cv_matrix = np.full((3, 1), np.nan)
+    lo, hi = np.array([0.0]), np.array([10.0])
+
+    objectives, feasible = compute_objectives(means, stds, cv_matrix, lo, hi, 1000.0, 1.0, False, True)
+    assert feasible.all()
+    assert int(np.argmax(objectives)) == 1, "maximize: the highest target must have the highest objective"
+
+    objectives, _ = compute_objectives(means, stds, cv_matrix, lo, hi, 1000.0, 1.0, False, False)
+    assert int(np.argmin(objectives)) == 0, "minimize: the lowest target must have the lowest objective"
+
+    # A CV violation worsens the objective in both directions
+    violating = np.array([[20.0], [5.0], [5.0]])
+    for maximize in (True, False):
+        objectives, feasible = compute_objectives(means, stds, violating, lo, hi, 1000.0, 1.0, False, maximize)
+        assert not feasible[0] and feasible[1:].all()
+        worse = objectives[0] < objectives[1] if maximize else objectives[0] > objectives[1]
+        assert worse, f"penalty must worsen the objective (maximize={maximize})"
+
+    print("✅ Objective direction and penalties are consistent")
+
+
+def test_optimizer_direction():
+    """maximize=True finds high targets, maximize=False low ones"""
+    print("\n" + "="*80)
+    print("TEST 2: Optimizer direction")
+    print("="*80)
+
+    optimizer = GPRCascadeOptimizer(LinearCascadeManager())
+    for maximize in (True, False):
+        request = _request(maximize)
+        study = optuna.create_study(
+            direction="maximize" if maximize else "minimize",
+            sampler=optuna.samplers.TPESampler(seed=42)
+        )
+        optimizer._run_trials(study, request, request.n_trials)
+        best_ore = study.best_trial.params["Ore"]
+        print(f"  maximize={maximize}: study best Ore = {best_ore:.2f}")
+        if maximize:
+            assert best_ore > 190.0, "maximize request must steer towards the upper MV bound"
+        else:
+            assert best_ore < 110.0, "minimize request must steer towards the lower MV bound"
+
+        result = optimizer.optimize(request)
+        print(f"  maximize={maximize}: result target = {result.best_target_value:.2f}")
+        assert result.is_feasible
+        assert (result.best_target_value > 190.0) if maximize else (result.best_target_value < 110.0)
+
+    print("✅ Optimizer follows the requested direction")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*80)
+    print("GPR OPTIMIZER DIRECTION TESTS")
+    print("="*80)
+
+    try:
+        test_compute_objectives_direction()
+        test_optimizer_direction()
+
+        print("\n" + "="*80)
+        print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+        print("="*80)
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
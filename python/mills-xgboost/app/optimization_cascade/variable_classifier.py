@@ -5,9 +5,10 @@ Maps frontend mills parameters to optimization variable types and provides
 utilities for variable classification and bounds management.
 """
 
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 
 class VariableType(Enum):
     MV = "MV"  # Manipulated Variables - what we control
@@ -26,6 +27,7 @@ class VariableInfo:
     max_bound: float
     description: str
     enabled: bool = True
+    step: Optional[float] = None  # Physical resolution of a setpoint (sampling step for MVs)
 
 class VariableClassifier:
     """
@@ -36,10 +38,10 @@ class VariableClassifier:
         # Variable classification based on mills-parameters.ts
         self.variable_mapping = {
             # Manipulated Variables (MVs) - what we control
-            "Ore": VariableInfo("Ore", "Разход на руда", VariableType.MV, "t/h", 140, 240, "Разход на входяща руда към мелницата"),
-            "WaterMill": VariableInfo("WaterMill", "Вода в мелницата", VariableType.MV, "m³/h", 5, 25, "Разход на вода в мелницата"),
-            "WaterZumpf": VariableInfo("WaterZumpf", "Вода в зумпфа", VariableType.MV, "m³/h", 140, 250, "Разход на вода в зумпф"),
-            "MotorAmp": VariableInfo("MotorAmp", "Ток на елетродвигателя", VariableType.MV, "A", 150, 250, "Консумация на ток от електродвигателя на мелницата"),
+            "Ore": VariableInfo("Ore", "Разход на руда", VariableType.MV, "t/h", 140, 240, "Разход на входяща руда към мелницата", step=0.1),
+            "WaterMill": VariableInfo("WaterMill", "Вода в мелницата", VariableType.MV, "m³/h", 5, 25, "Разход на вода в мелницата", step=0.1),
+            "WaterZumpf": VariableInfo("WaterZumpf", "Вода в зумпфа", VariableType.MV, "m³/h", 140, 250, "Разход на вода в зумпф", step=0.1),
+            "MotorAmp": VariableInfo("MotorAmp", "Ток на елетродвигателя", VariableType.MV, "A", 150, 250, "Консумация на ток от електродвигателя на мелницата", step=0.1),
             
             # Controlled Variables (CVs) - what we measure
             "PulpHC": VariableInfo("PulpHC", "Пулп в ХЦ", VariableType.CV, "m³/h", 400, 600, "Разход на пулп в ХЦ"),
@@ -59,14 +61,23 @@ class VariableClassifier:
             "PSI80": VariableInfo("PSI80", "Фракция -80 μk", VariableType.TARGET, "%", 40, 60.0, "Класификация на размерите на частиците при 80 микрона", enabled=False),
             "PSI200": VariableInfo("PSI200", "Фракция +200 μk", VariableType.TARGET, "%", 10, 40, "Основна целева стойност - финност на смилане +200 микрона"),
         }
+        
+        # The mapping is fixed after construction - bucket it by type once so the
+        # getters below don't re-scan and re-filter it on every call
+        self._by_type: Dict[VariableType, List[VariableInfo]] = {var_type: [] for var_type in VariableType}
+        self._by_type_enabled: Dict[VariableType, List[VariableInfo]] = {var_type: [] for var_type in VariableType}
+        for var in self.variable_mapping.values():
+            self._by_type[var.var_type].append(var)
+            if var.enabled:
+                self._by_type_enabled[var.var_type].append(var)
+        
+        self._mv_bounds = {mv.id: (mv.min_bound, mv.max_bound) for mv in self._by_type_enabled[VariableType.MV]}
+        self._cv_constraints = {cv.id: (cv.min_bound, cv.max_bound) for cv in self._by_type_enabled[VariableType.CV]}
     
     def get_variables_by_type(self, var_type: VariableType, enabled_only: bool = True) -> List[VariableInfo]:
         """Get all variables of a specific type"""
-        variables = [var for var in self.variable_mapping.values() 
-                    if var.var_type == var_type]
-        if enabled_only:
-            variables = [var for var in variables if var.enabled]
-        return variables
+        # Copies: the classifier may be the process-wide shared instance
+        return list(self._by_type_enabled[var_type] if enabled_only else self._by_type[var_type])
     
     def get_mvs(self, enabled_only: bool = True) -> List[VariableInfo]:
         """Get Manipulated Variables (what we control)"""
@@ -86,13 +97,15 @@ class VariableClassifier:
     
     def get_mv_bounds(self) -> Dict[str, Tuple[float, float]]:
         """Get bounds for manipulated variables"""
-        mvs = self.get_mvs()
-        return {mv.id: (mv.min_bound, mv.max_bound) for mv in mvs}
+        return dict(self._mv_bounds)
+    
+    def get_mv_steps(self) -> Dict[str, float]:
+        """Get sampling steps (physical setpoint resolution) for manipulated variables"""
+        return {mv.id: mv.step for mv in self.get_mvs() if mv.step}
     
     def get_cv_constraints(self) -> Dict[str, Tuple[float, float]]:
         """Get acceptable ranges for controlled variables (process constraints)"""
-        cvs = self.get_cvs()
-        return {cv.id: (cv.min_bound, cv.max_bound) for cv in cvs}
+        return dict(self._cv_constraints)
     
     def get_variable_info(self, var_id: str) -> VariableInfo:
         """Get information about a specific variable"""
@@ -165,3 +178,14 @@ class VariableClassifier:
         
         print(f"\nCascade Flow: MVs → CVs → Target (with DVs)")
         print("=" * 50)
+
+
+@lru_cache(maxsize=1)
+def get_default_classifier() -> VariableClassifier:
+    """
+    Process-wide VariableClassifier
+    
+    The variable mapping is static, so model managers and optimizers share one
+    instance instead of rebuilding it on every construction. Treat it as read-only.
+    """
+    return VariableClassifier()